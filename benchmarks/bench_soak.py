@@ -0,0 +1,95 @@
+"""长时间运行（soak）基准：以无尽模式无界面推进模拟，周期性建造/拆除塔，
+按子系统采样内存报告，检查后半程内存峰值是否相对前半程保持平稳。
+
+无尽模式的单波预算在达到 WaveGenerator.MAX_BUDGET 之前逐波增长，场上敌人随之增多，
+这段预热期的内存上升不是泄漏，因此只比较预算饱和之后的稳态采样。
+
+用法：python benchmarks/bench_soak.py [--hours 10] [--dt 0.1] [--tolerance 0.2]
+模拟时间按 dt 步进，10 小时默认约 36 万帧；不需要 pygame。"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from game.core.game import Game  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=10.0, help="模拟时长（小时）")
+    parser.add_argument("--dt", type=float, default=0.1, help="每帧模拟步长（秒）")
+    parser.add_argument("--sample-minutes", type=float, default=10.0, help="采样间隔（模拟分钟）")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="后半程峰值允许超出前半程的比例")
+    parser.add_argument("--level", default="level1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    game = Game(None)
+    game.setup(args.level)
+    assert game.director is not None and game.grid_map is not None
+    game.director.endless = True
+    # 生命设为极大值，避免防线崩溃后模拟停止
+    game.life = game.initial_life = 10 ** 9
+    game.gold = 10 ** 9
+
+    total_frames = int(args.hours * 3600 / args.dt)
+    sample_every = max(1, int(args.sample_minutes * 60 / args.dt))
+    churn_every = max(1, int(30 / args.dt))
+    tile_size = game.grid_map.tile_size
+    samples = []
+    # 预算饱和前的采样只打印不参与判断
+    warmup_samples = 0
+    generator = game.director.generator
+    started = time.perf_counter()
+    for frame in range(1, total_frames + 1):
+        game.update(args.dt, frame * args.dt)
+        if frame % churn_every == 0:
+            towers = list(game.entities.towers)
+            if towers and (len(towers) > 12 or rng.random() < 0.4):
+                game.remove_tower(rng.choice(towers))
+            else:
+                game.selected_tower = rng.choice(list(game.tower_table))
+                tile = (rng.randrange(game.grid_map.width), rng.randrange(game.grid_map.height))
+                game._handle_build((tile[0] * tile_size, tile[1] * tile_size))
+        if frame % sample_every == 0:
+            report = game.memory_report()
+            director = game.director
+            saturated = (
+                generator.budget(director.current_wave_index, director.enemy_ai.difficulty_score)
+                >= generator.MAX_BUDGET
+            )
+            if saturated or samples:
+                samples.append(report["total"]["bytes"])
+            else:
+                warmup_samples += 1
+            hours = frame * args.dt / 3600
+            summary = "  ".join(f"{name}={item['bytes']}" for name, item in report.items() if name != "total")
+            phase = "稳态" if samples else "预热"
+            print(
+                f"[{hours:6.2f}h {phase}] total={report['total']['bytes']:>9} B  "
+                f"objects={report['total']['objects']:>6}  {summary}"
+            )
+
+    elapsed = time.perf_counter() - started
+    print(f"模拟 {args.hours:.2f} 小时，共 {total_frames} 帧，耗时 {elapsed:.1f} s，波次 {game.director.current_wave_index + 1}")
+    print(f"预热采样 {warmup_samples} 个，稳态采样 {len(samples)} 个")
+    if len(samples) < 4:
+        print("波次预算饱和后的采样点不足，无法判断内存趋势，请延长 --hours")
+        return 0
+    half = len(samples) // 2
+    first_peak = max(samples[:half])
+    second_peak = max(samples[half:])
+    growth = second_peak / max(1, first_peak) - 1.0
+    print(f"稳态前半程峰值 {first_peak} B，后半程峰值 {second_peak} B，增长 {growth:+.1%}")
+    return 0 if growth <= args.tolerance else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""启动耗时基准：测量导入、关卡加载与首帧渲染时间，超出预算时以非零状态退出。
+
+用法：python benchmarks/bench_startup.py [--budget-ms 800]
+使用 SDL 的 dummy 视频驱动，可在无显示环境下运行。"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+STARTED_AT = time.perf_counter()
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="首帧耗时预算（毫秒）")
+    parser.add_argument("--level", default="level1")
+    args = parser.parse_args()
+
+    from game.core.config_loader import DataManager
+    from game.core.game import Game
+
+    # 模拟层不应在导入时拉起 pygame
+    if "pygame" in sys.modules:
+        print("错误: 导入 game.core.game 时加载了 pygame")
+        return 1
+    imported_at = time.perf_counter()
+
+    import pygame
+
+    pygame.display.init()
+    pygame.font.init()
+    data = DataManager()
+    level = data.load_level(args.level)
+    tile_size = 64
+    screen = pygame.display.set_mode((len(level["grid"][0]) * tile_size, len(level["grid"]) * tile_size))
+    game = Game(screen, data=data)
+    game.setup(args.level, level_data=level)
+    setup_at = time.perf_counter()
+
+    game.update(1 / 60, 0.0)
+    game.render()
+    pygame.display.flip()
+    first_frame_ms = (time.perf_counter() - STARTED_AT) * 1000.0
+    pygame.quit()
+
+    print(f"导入: {(imported_at - STARTED_AT) * 1000.0:.1f} ms")
+    print(f"初始化: {(setup_at - imported_at) * 1000.0:.1f} ms")
+    print(f"首帧: {first_frame_ms:.1f} ms (预算 {args.budget_ms:.0f} ms)")
+    return 0 if first_frame_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
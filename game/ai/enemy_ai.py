@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 
 
 @dataclass
@@ -15,16 +15,32 @@ class EnemyModifier:
 class EnemyAdaptiveAI:
     """根据战局表现调整敌人强度。"""
 
+    # 难度系数的上下限，避免长时间无尽模式下无限增长
+    MIN_DIFFICULTY = 0.25
+    MAX_DIFFICULTY = 4.0
+
     def __init__(self) -> None:
         self.difficulty_score = 1.0
 
-    def update(self, wave_index: int, player_life_ratio: float) -> EnemyModifier:
-        """根据当前波次与玩家生命比例调整难度。"""
+    def update(
+        self,
+        wave_index: int,
+        player_life_ratio: float,
+        predicted_leak_ratio: Optional[float] = None,
+    ) -> EnemyModifier:
+        """根据当前波次、玩家生命比例与导演预估的漏怪比例调整难度。"""
         # 玩家生命越高说明压力不足，略微提高难度；反之降低
         if player_life_ratio > 0.8:
             self.difficulty_score *= 1.05
         elif player_life_ratio < 0.4:
             self.difficulty_score *= 0.95
+        # 防线预计能全部拦下时加压，预计大量漏怪时放缓
+        if predicted_leak_ratio is not None:
+            if predicted_leak_ratio <= 0.0:
+                self.difficulty_score *= 1.03
+            elif predicted_leak_ratio > 0.5:
+                self.difficulty_score *= 0.97
+        self.difficulty_score = min(self.MAX_DIFFICULTY, max(self.MIN_DIFFICULTY, self.difficulty_score))
         # 难度随波次线性增长
         base = 1.0 + wave_index * 0.05
         score = base * self.difficulty_score
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 固定元素槽位顺序，新元素会追加到末尾
+DEFAULT_ELEMENTS: Tuple[str, ...] = ("earth", "air", "physical", "arcane", "fire", "frost")
+# 塔尚未遇到的元素，首次遇到时以 1.0 入场，此前不参与衰减
+UNSEEN = math.nan
+
+
+class PreferenceRow:
+    """单座塔的元素偏好，真实值 = values[slot] * scale。
+
+    衰减只需把 scale 乘以系数，因而每次学习都是 O(1)；
+    scale 过小时再统一折算回 values，避免浮点下溢。
+    未遇到的元素记为 UNSEEN，首次读取或学习时才按 1.0 / scale 写入，与逐项衰减时一致。"""
+
+    __slots__ = ("tower_type", "scale", "values")
+
+    def __init__(self, tower_type: str, values: Iterable[float]) -> None:
+        self.tower_type = tower_type
+        self.scale = 1.0
+        self.values = array("d", values)
+
+    def touch(self, slot: int) -> None:
+        """标记元素已遇到，未遇到时以当前真实值 1.0 入场。"""
+        while len(self.values) <= slot:
+            self.values.append(UNSEEN)
+        if math.isnan(self.values[slot]):
+            self.values[slot] = 1.0 / self.scale
+
+    def get(self, slot: int) -> float:
+        self.touch(slot)
+        return self.values[slot] * self.scale
+
+    def effective(self) -> array:
+        """真实值，未遇到的元素保持 UNSEEN。"""
+        return array("d", (value * self.scale for value in self.values))
+
+    def renormalize(self) -> None:
+        for slot in range(len(self.values)):
+            self.values[slot] *= self.scale
+        self.scale = 1.0
+
+
+class PreferenceStore:
+    """紧凑的塔元素偏好存储：惰性衰减、定期归一化，并按塔类型持久化。"""
+
+    DECAY = 0.98
+    LEARN_RATE = 0.01
+    RENORMALIZE_BELOW = 1e-6
+
+    def __init__(self, elements: Iterable[str] = DEFAULT_ELEMENTS) -> None:
+        self.elements: List[str] = []
+        self.slots: Dict[str, int] = {}
+        for element in elements:
+            self.slot(element)
+        self.rows: Dict[int, PreferenceRow] = {}
+        # 按塔类型保存的学习结果，用于初始化新建的塔
+        self.type_seeds: Dict[str, array] = {}
+
+    def slot(self, element: str) -> int:
+        slot = self.slots.get(element)
+        if slot is None:
+            slot = len(self.elements)
+            self.elements.append(element)
+            self.slots[element] = slot
+        return slot
+
+    def row(self, tower_id: int, tower_type: str = "") -> PreferenceRow:
+        row = self.rows.get(tower_id)
+        if row is None:
+            seed = self.type_seeds.get(tower_type)
+            row = PreferenceRow(tower_type, seed if seed is not None else ())
+            self.rows[tower_id] = row
+        return row
+
+    def get(self, tower_id: int, element: str, tower_type: str = "") -> float:
+        return self.row(tower_id, tower_type).get(self.slot(element))
+
+    def learn(self, tower_id: int, element: str, damage: float, tower_type: str = "") -> None:
+        """已遇到的偏好按 DECAY 衰减，命中元素增加 damage * LEARN_RATE。"""
+        row = self.row(tower_id, tower_type)
+        slot = self.slot(element)
+        row.scale *= self.DECAY
+        row.touch(slot)
+        row.values[slot] += damage * self.LEARN_RATE / row.scale
+        if row.scale < self.RENORMALIZE_BELOW:
+            row.renormalize()
+
+    def forget(self, tower_id: int) -> None:
+        """移除塔时调用，把它的学习结果并入所属类型。"""
+        row = self.rows.pop(tower_id, None)
+        if row is not None and row.tower_type:
+            self.type_seeds[row.tower_type] = row.effective()
+
+    def prune(self, is_alive: Callable[[int], bool]) -> int:
+        """移除已不存在的塔的记录（并入类型种子），返回清理数量。"""
+        stale = [tower_id for tower_id in self.rows if not is_alive(tower_id)]
+        for tower_id in stale:
+            self.forget(tower_id)
+        return len(stale)
+
+    def _collect_types(self) -> Dict[str, array]:
+        """按类型平均各塔的偏好，只统计遇到过该元素的塔。"""
+        totals: Dict[str, List[float]] = {}
+        counts: Dict[str, List[int]] = {}
+        size = len(self.elements)
+        for row in self.rows.values():
+            if not row.tower_type:
+                continue
+            total = totals.setdefault(row.tower_type, [0.0] * size)
+            count = counts.setdefault(row.tower_type, [0] * size)
+            for slot, value in enumerate(row.effective()):
+                if not math.isnan(value):
+                    total[slot] += value
+                    count[slot] += 1
+        merged = dict(self.type_seeds)
+        for tower_type, total in totals.items():
+            count = counts[tower_type]
+            merged[tower_type] = array(
+                "d", (value / count[slot] if count[slot] else UNSEEN for slot, value in enumerate(total))
+            )
+        return merged
+
+    def save(self, path: str) -> None:
+        """以元素名为键写入 JSON，元素顺序变化后仍可读取。"""
+        payload = {
+            tower_type: {
+                self.elements[slot]: value for slot, value in enumerate(values) if not math.isnan(value)
+            }
+            for tower_type, values in self._collect_types().items()
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(payload, fp, ensure_ascii=False, indent=2)
+
+    def load(self, path: str) -> bool:
+        """读取上次保存的偏好，文件不存在或损坏时返回 False。"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                payload: Optional[Dict[str, Dict[str, float]]] = json.load(fp)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(payload, dict):
+            return False
+        seeds: Dict[str, Dict[str, float]] = {}
+        for tower_type, prefs in payload.items():
+            if not isinstance(prefs, dict):
+                return False
+            try:
+                seeds[tower_type] = {str(element): float(value) for element, value in prefs.items()}
+            except (TypeError, ValueError):
+                return False
+            if not all(math.isfinite(value) for value in seeds[tower_type].values()):
+                return False
+        for tower_type, prefs in seeds.items():
+            for element in prefs:
+                self.slot(element)
+            seed = array("d", [UNSEEN] * len(self.elements))
+            for element, value in prefs.items():
+                seed[self.slots[element]] = value
+            self.type_seeds[tower_type] = seed
+        return True
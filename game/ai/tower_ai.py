@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import math
-from collections import defaultdict
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 from game.ecs import components as comp
 from game.ecs.entities import EntityManager
+from .preferences import PreferenceStore
+
+
+# 有序选靶策略：策略名 -> (排序字段, 是否降序)，候选范围由进度索引按射程区间给出
+ORDERED_POLICIES: Dict[str, Tuple[str, bool]] = {
+    "first": ("progress", True),
+    "last": ("progress", False),
+    "strongest": ("health", True),
+    "weakest": ("health", False),
+}
 
 
 class TowerBrain:
@@ -13,7 +22,7 @@ class TowerBrain:
 
     def __init__(self, grid_size: int) -> None:
         self.grid_size = grid_size
-        self.preferences: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(lambda: 1.0))
+        self.preferences = PreferenceStore()
 
     def select_target(
         self,
@@ -22,9 +31,46 @@ class TowerBrain:
         position: comp.Position,
         entities: EntityManager,
     ) -> Optional[int]:
+        policy = ORDERED_POLICIES.get(tower.targeting)
+        if policy is not None:
+            key, reverse = policy
+            radius = tower.range * self.grid_size
+            index = entities.enemy_index
+            if key == "progress":
+                return index.first_in_range(position.x, position.y, radius, self.grid_size, reverse)
+            candidates = index.in_range(position.x, position.y, radius, self.grid_size)
+            return self._pick_by_health(candidates, reverse, entities)
+        return self._select_by_score(tower_id, tower, position, entities)
+
+    @staticmethod
+    def _pick_by_health(candidates: Iterable[int], reverse: bool, entities: EntityManager) -> Optional[int]:
+        """在射程内的敌人中按生命值取最高（reverse=True）或最低者。"""
+        best_id: Optional[int] = None
+        best_health = 0.0
+        for enemy_id in candidates:
+            combat = entities.combats.get(enemy_id)
+            if combat is None:
+                continue
+            if best_id is None or (combat.health > best_health if reverse else combat.health < best_health):
+                best_id = enemy_id
+                best_health = combat.health
+        return best_id
+
+    def _select_by_score(
+        self,
+        tower_id: int,
+        tower: comp.Tower,
+        position: comp.Position,
+        entities: EntityManager,
+    ) -> Optional[int]:
+        """默认 smart 策略：综合元素偏好、剩余生命与距离打分。"""
         best_id: Optional[int] = None
         best_score = -1.0
+        prefs = self.preferences.row(tower_id, tower.tower_type)
+        pending = entities.commands.pending_destroy
         for enemy_id, enemy in entities.enemies.items():
+            if enemy_id in pending:
+                continue
             target_pos = entities.positions.get(enemy_id)
             target_stats = entities.combats.get(enemy_id)
             if not target_pos or not target_stats:
@@ -32,7 +78,7 @@ class TowerBrain:
             distance = math.dist((position.x, position.y), (target_pos.x, target_pos.y))
             if distance > tower.range * self.grid_size:
                 continue
-            preference = self.preferences[tower_id][target_stats.element]
+            preference = prefs.get(self.preferences.slot(target_stats.element))
             health_factor = target_stats.health / max(1.0, target_stats.max_health)
             distance_factor = 1.0 - min(1.0, distance / (tower.range * self.grid_size + 1e-5))
             score = preference * (1.2 - health_factor) + distance_factor
@@ -41,9 +87,6 @@ class TowerBrain:
                 best_id = enemy_id
         return best_id
 
-    def learn(self, tower_id: int, enemy_element: str, damage: float) -> None:
-        """简单学习：根据造成的伤害调整元素偏好。"""
-        prefs = self.preferences[tower_id]
-        for element in list(prefs.keys()):
-            prefs[element] *= 0.98
-        prefs[enemy_element] += damage * 0.01
+    def learn(self, tower_id: int, enemy_element: str, damage: float, tower_type: str = "") -> None:
+        """简单学习：根据造成的伤害调整元素偏好，衰减由偏好存储惰性完成。"""
+        self.preferences.learn(tower_id, enemy_element, damage, tower_type)
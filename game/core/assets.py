@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pygame
+
+
+class FontCache:
+    """字体缓存：字体文件路径解析一次并持久化，Font 对象按 (名称, 字号) 复用。
+
+    ``pygame.font.SysFont`` 每次调用都会扫描系统字体目录，启动与逐帧绘制都很慢；
+    这里只在缓存缺失或文件已失效时调用 ``match_font``，结果写入 cache_path。
+    找不到的字体只在本次运行内记为 None，不写入磁盘，之后安装的字体下次启动即可识别。"""
+
+    def __init__(self, cache_path: Optional[str] = None) -> None:
+        self.cache_path = cache_path
+        self.paths: Dict[str, Optional[str]] = {}
+        self.fonts: Dict[Tuple[str, int], "pygame.font.Font"] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fp:
+                payload = json.load(fp)
+        except (OSError, ValueError):
+            return
+        if isinstance(payload, dict):
+            self.paths = {
+                name: path for name, path in payload.items() if isinstance(path, str) and os.path.exists(path)
+            }
+
+    def save(self) -> None:
+        if not self.cache_path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as fp:
+            found = {name: path for name, path in self.paths.items() if path is not None}
+            json.dump(found, fp, ensure_ascii=False, indent=2)
+        self._dirty = False
+
+    def resolve(self, name: str) -> Optional[str]:
+        """返回字体文件路径，找不到时为 None（使用 pygame 默认字体）。"""
+        if name not in self.paths:
+            import pygame
+
+            path = pygame.font.match_font(name)
+            self.paths[name] = path
+            if path is not None:
+                self._dirty = True
+                self.save()
+        return self.paths[name]
+
+    def get(self, name: str, size: int) -> "pygame.font.Font":
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            import pygame
+
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(self.resolve(name), size)
+            self.fonts[key] = font
+        return font
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """一档画质/模拟精度配置。"""
+
+    name: str
+    # 塔完整重新选靶轮转周期的倍率，其余帧沿用仍有效的目标
+    retarget_scale: int
+    # HUD 文字重新排版的间隔帧数
+    hud_interval: int
+    # 是否绘制覆盖热力图、选择提示等非必要内容
+    draw_extras: bool
+
+
+QUALITY_LEVELS: List[QualityLevel] = [
+    QualityLevel("full", retarget_scale=1, hud_interval=1, draw_extras=True),
+    QualityLevel("reduced", retarget_scale=2, hud_interval=4, draw_extras=True),
+    QualityLevel("low", retarget_scale=4, hud_interval=10, draw_extras=False),
+    QualityLevel("minimal", retarget_scale=8, hud_interval=30, draw_extras=False),
+]
+
+
+class FrameBudget:
+    """帧预算看门狗：统计每帧更新与渲染耗时，超预算时逐级降档，负载下降后逐级恢复。
+
+    使用指数滑动平均平滑单帧抖动，并要求在当前档位停留一定帧数后才再次调整，避免来回震荡。"""
+
+    def __init__(
+        self,
+        budget_ms: float = 16.0,
+        smoothing: float = 0.1,
+        recover_ratio: float = 0.6,
+        hold_frames: int = 15,
+        levels: Optional[List[QualityLevel]] = None,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.smoothing = smoothing
+        self.recover_ratio = recover_ratio
+        self.hold_frames = hold_frames
+        self.levels = levels or QUALITY_LEVELS
+        self.level_index = 0
+        self.average_ms = 0.0
+        self.frame_count = 0
+        self._frame_ms = 0.0
+        self._frames_at_level = 0
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.level_index]
+
+    def track(self, elapsed_seconds: float) -> None:
+        """累计当前帧中某一阶段（更新或渲染）的耗时。"""
+        self._frame_ms += elapsed_seconds * 1000.0
+
+    def measure_since(self, started: float) -> None:
+        self.track(time.perf_counter() - started)
+
+    def next_frame(self) -> bool:
+        """结束上一帧的统计并按需调整档位，返回档位是否变化。"""
+        if self.frame_count == 0:
+            self.average_ms = self._frame_ms
+        else:
+            self.average_ms += (self._frame_ms - self.average_ms) * self.smoothing
+        self._frame_ms = 0.0
+        self.frame_count += 1
+        self._frames_at_level += 1
+        if self._frames_at_level < self.hold_frames:
+            return False
+        if self.average_ms > self.budget_ms and self.level_index + 1 < len(self.levels):
+            self.level_index += 1
+        elif self.average_ms < self.budget_ms * self.recover_ratio and self.level_index > 0:
+            # 恢复比降档更保守，需停留更久
+            if self._frames_at_level < self.hold_frames * 3:
+                return False
+            self.level_index -= 1
+        else:
+            return False
+        self._frames_at_level = 0
+        return True
+
+    def export(self) -> Dict:
+        return {
+            "level": self.level_index,
+            "name": self.level.name,
+            "frame_ms": round(self.average_ms, 3),
+            "budget_ms": self.budget_ms,
+        }
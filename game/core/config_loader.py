@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import os
 import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 
 
@@ -16,7 +17,7 @@ class DataManager:
     因此这里将数据目录改为默认使用模块所在位置推导出来的绝对路径，
     并对外提供自定义路径的能力。"""
 
-    def __init__(self, base_path: Optional[str] = None) -> None:
+    def __init__(self, base_path: Optional[str] = None, max_cached_files: int = 32) -> None:
         # 计算项目根目录（game/core/ -> game -> 项目根）
         module_dir = os.path.dirname(__file__)
         project_root = os.path.abspath(os.path.join(module_dir, "..", ".."))
@@ -36,8 +37,10 @@ class DataManager:
         if not os.path.isdir(self.base_path):
             raise FileNotFoundError(f"数据目录不存在: {self.base_path}")
 
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        # 按最近使用排序，超过 max_cached_files 时淘汰最久未用的文件
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.mtimes: Dict[str, float] = {}
+        self.max_cached_files = max_cached_files
 
     def _load_json(self, path: str) -> Any:
         with open(path, "r", encoding="utf-8") as fp:
@@ -63,6 +66,10 @@ class DataManager:
         if relative not in self.cache or self.mtimes.get(relative) != mtime:
             self.cache[relative] = self._load_json(full)
             self.mtimes[relative] = mtime
+        self.cache.move_to_end(relative)
+        while len(self.cache) > max(1, self.max_cached_files):
+            evicted, _ = self.cache.popitem(last=False)
+            self.mtimes.pop(evicted, None)
         return self.cache[relative]
 
     def hot_reload(self) -> None:
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+from .pathfinding import GridPosition
+
+
+class CoverageMap:
+    """逐格的塔覆盖数与期望 DPS。
+
+    塔放置/移除时只更新其射程内的格子（O(range²)），不会遍历全部塔，
+    导演可据此直接估算敌人沿路径承受的伤害，HUD 也能绘制热力图。"""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.dps: List[float] = [0.0] * (width * height)
+        self.counts: List[int] = [0] * (width * height)
+        self.towers: Dict[GridPosition, Tuple[float, float]] = {}
+        # 仅作热力图归一化的上界，移除塔时不回退
+        self.max_dps = 0.0
+        # 每次覆盖变化递增，便于调用方缓存派生数据
+        self.version = 0
+
+    def _covered_tiles(self, tile: GridPosition, tile_range: float) -> Iterable[int]:
+        """与塔的选靶判定一致：格子中心距离不超过射程。"""
+        cx, cy = tile
+        reach = int(tile_range)
+        limit = tile_range * tile_range
+        for y in range(max(0, cy - reach), min(self.height, cy + reach + 1)):
+            dy = y - cy
+            for x in range(max(0, cx - reach), min(self.width, cx + reach + 1)):
+                dx = x - cx
+                if dx * dx + dy * dy <= limit:
+                    yield y * self.width + x
+
+    def _apply(self, tile: GridPosition, tile_range: float, dps: float, sign: int) -> None:
+        for index in self._covered_tiles(tile, tile_range):
+            self.dps[index] += dps * sign
+            self.counts[index] += sign
+            if sign > 0 and self.dps[index] > self.max_dps:
+                self.max_dps = self.dps[index]
+        if sign < 0 and not self.towers:
+            self.max_dps = 0.0
+        self.version += 1
+
+    def add_tower(self, tile: GridPosition, tile_range: float, dps: float) -> None:
+        if tile in self.towers:
+            self.remove_tower(tile)
+        self.towers[tile] = (tile_range, dps)
+        self._apply(tile, tile_range, dps, 1)
+
+    def remove_tower(self, tile: GridPosition) -> None:
+        entry = self.towers.pop(tile, None)
+        if entry is None:
+            return
+        self._apply(tile, entry[0], entry[1], -1)
+
+    def dps_at(self, tile: GridPosition) -> float:
+        x, y = tile
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0.0
+        return self.dps[y * self.width + x]
+
+    def path_damage(self, path: Iterable[GridPosition], speed: float) -> float:
+        """敌人以 speed（格/秒）走完路径时承受的期望伤害，每格停留 1/speed 秒。"""
+        total = sum(self.dps[y * self.width + x] for x, y in path)
+        return total / max(0.01, speed)
@@ -1,32 +1,44 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Callable, Optional
+from typing import Deque, Dict, List, Callable, Optional
 
 from game.ai.enemy_ai import EnemyAdaptiveAI, EnemyModifier
 from game.ecs import components as comp
 from game.ecs.entities import EntityManager
 from .map import GridMap
 from .config_loader import DataManager
+from .waves import SpawnTimeline, WaveEnemy, WaveGenerator
 
 
 @dataclass
-class WaveEnemy:
-    enemy_type: str
-    count: int
-    interval: float
-    timer: float = 0.0
+class WavePrediction:
+    """基于覆盖图的波次结果预估，不做试跑模拟。
+
+    多出生点时敌人按轮转平均分配，数量按各路线的份额计，可能带小数。"""
+
+    enemy_count: float = 0.0
+    expected_leaks: float = 0.0
+
+    @property
+    def leak_ratio(self) -> float:
+        return self.expected_leaks / max(1, self.enemy_count)
 
 
 class GameDirector:
     """导演系统：协调波次、敌人 AI 与生成逻辑。"""
 
+    # 提前构建的后续波次数量
+    LOOKAHEAD_WAVES = 1
+
     def __init__(
         self,
         data: DataManager,
         entity_manager: EntityManager,
         grid_map: GridMap,
         level_data: Dict,
+        endless: Optional[bool] = None,
     ) -> None:
         self.data = data
         self.entities = entity_manager
@@ -34,53 +46,110 @@ class GameDirector:
         self.level_data = level_data
         self.enemy_table = data.load_table("enemies")
         self.waves: List[Dict] = level_data["waves"]
+        self.endless = level_data.get("endless", False) if endless is None else endless
         self.current_wave_index = -1
-        self.wave_state: List[WaveEnemy] = []
+        self.timeline: Optional[SpawnTimeline] = None
+        self.upcoming: Deque[SpawnTimeline] = deque()
+        self.generator = WaveGenerator(self.enemy_table, seed=level_data.get("seed", 0))
         self.enemy_ai = EnemyAdaptiveAI()
         self.current_modifier = EnemyModifier()
+        self.last_prediction: Optional[WavePrediction] = None
+        self._spawn_cursor = 0
         self.active = False
 
+    @property
+    def total_waves(self) -> Optional[int]:
+        """固定波次总数，无尽模式返回 None。"""
+        return None if self.endless else len(self.waves)
+
+    def _build_wave(self, wave_index: int) -> Optional[SpawnTimeline]:
+        if wave_index < len(self.waves):
+            groups = [
+                WaveEnemy(enemy_type=item["type"], count=item["count"], interval=item["interval"] / 1000.0)
+                for item in self.waves[wave_index]["enemies"]
+            ]
+        elif self.endless:
+            self.generator.enemy_table = self.enemy_table
+            groups = self.generator.generate(wave_index, self.enemy_ai.difficulty_score)
+        else:
+            return None
+        return SpawnTimeline(groups)
+
+    def prepare_upcoming(self) -> None:
+        """在当前波次进行中预先构建后续波次并预热路径，避免开波与生成敌人时集中计算。"""
+        self.map.warm_paths()
+        next_index = self.current_wave_index + 1 + len(self.upcoming)
+        while len(self.upcoming) < self.LOOKAHEAD_WAVES:
+            timeline = self._build_wave(next_index)
+            if timeline is None:
+                return
+            self.upcoming.append(timeline)
+            next_index += 1
+
+    def predict_wave(self, timeline: SpawnTimeline) -> WavePrediction:
+        """按各出生点的当前路径与覆盖图估算每组敌人能否走到终点。
+
+        spawn_enemy 在出生点间轮转，每组敌人按出生点数平均分到各路线；无路可走的出生点不会生成敌人。
+        忽略塔之间的火力分配与过量伤害，结果偏乐观，仅用于难度调节。"""
+        prediction = WavePrediction()
+        starts = self.map.starts
+        paths = [path for path in (self.map.find_path(start) for start in starts) if path]
+        if not paths:
+            return prediction
+        share = 1.0 / len(starts)
+        modifier = self.current_modifier
+        for group in timeline.groups:
+            template = self.enemy_table.get(group.enemy_type)
+            if template is None:
+                continue
+            health = template["health"] * modifier.health_multiplier
+            speed = template["speed"] * modifier.speed_multiplier
+            for path in paths:
+                prediction.enemy_count += group.count * share
+                if self.map.coverage.path_damage(path, speed) < health:
+                    prediction.expected_leaks += group.count * share
+        return prediction
+
     def start_next_wave(self, player_life_ratio: float) -> bool:
         """开启下一波次，返回是否成功。"""
         if self.active and self.entities.enemies:
             return False
-        if self.current_wave_index + 1 >= len(self.waves):
+        timeline = self.upcoming.popleft() if self.upcoming else self._build_wave(self.current_wave_index + 1)
+        if timeline is None:
             return False
         self.current_wave_index += 1
-        wave = self.waves[self.current_wave_index]
-        self.wave_state = [
-            WaveEnemy(enemy_type=item["type"], count=item["count"], interval=item["interval"] / 1000.0)
-            for item in wave["enemies"]
-        ]
-        self.current_modifier = self.enemy_ai.update(self.current_wave_index, player_life_ratio)
+        self.timeline = timeline
+        self.last_prediction = self.predict_wave(timeline)
+        self.current_modifier = self.enemy_ai.update(
+            self.current_wave_index, player_life_ratio, self.last_prediction.leak_ratio
+        )
         self.active = True
         return True
 
     def update(self, dt: float, get_player_life_ratio: Callable[[], float]) -> None:
-        if not self.active:
+        if not self.active or self.timeline is None:
             return
-        finished_groups = 0
-        for group in self.wave_state:
-            if group.count <= 0:
-                finished_groups += 1
-                continue
-            group.timer -= dt
-            if group.timer <= 0:
-                self.spawn_enemy(group.enemy_type)
-                group.count -= 1
-                group.timer = group.interval
-        if finished_groups == len(self.wave_state):
-            # 若场上无敌人则自动进入下一波
-            if not self.entities.enemies:
+        for enemy_type in self.timeline.advance(dt):
+            self.spawn_enemy(enemy_type)
+        if self.timeline.finished:
+            # 生成阶段结束后、清场之前构建下一波
+            self.prepare_upcoming()
+            # 若场上无敌人（包括本帧排队生成的）则自动进入下一波
+            if not self.entities.enemies and not self.entities.commands.pending_create:
                 self.active = False
                 self.start_next_wave(get_player_life_ratio())
 
     def spawn_enemy(self, enemy_type: str) -> None:
         template = self.enemy_table[enemy_type]
-        path = self.map.find_path()
+        # 多出生点时轮流使用
+        start = self.map.starts[self._spawn_cursor % len(self.map.starts)]
+        self._spawn_cursor += 1
+        path = self.map.find_path(start)
         if not path:
             return
-        entity_id = self.entities.create()
+        # 系统更新期间只排队，敌人在本帧同步点统一加入
+        commands = self.entities.commands
+        entity_id = commands.create()
         position = comp.Position(
             x=path[0][0] * self.map.tile_size + self.map.tile_size / 2,
             y=path[0][1] * self.map.tile_size + self.map.tile_size / 2,
@@ -98,8 +167,8 @@ class GameDirector:
             bounty=template["bounty"],
         )
         render = comp.Renderable(color=(200, 80, 80), radius=16)
-        self.entities.add_component(entity_id, position)
-        self.entities.add_component(entity_id, stats)
-        self.entities.add_component(entity_id, enemy)
-        self.entities.add_component(entity_id, render)
-        self.entities.add_component(entity_id, comp.Effects())
+        commands.add(entity_id, position)
+        commands.add(entity_id, stats)
+        commands.add(entity_id, enemy)
+        commands.add(entity_id, render)
+        commands.add(entity_id, comp.Effects())
@@ -1,32 +1,51 @@
 from __future__ import annotations
 
-import pygame
-from typing import Dict, Tuple, Optional, Callable
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Tuple, Optional, Callable
 
 from game.ai.tower_ai import TowerBrain
+from game.core.assets import FontCache
+from game.core.budget import FrameBudget
 from game.core.combat import DamageCalculator
 from game.core.config_loader import DataManager
 from game.core.director import GameDirector
 from game.core.map import GridMap
+from game.core.memory import MemoryLimits, memory_report
 from game.core.ui import HUD
 from game.ecs.entities import EntityManager
 from game.ecs import components as comp
 from game.ecs.systems import MovementSystem, TowerSystem, CleanupSystem
 
+if TYPE_CHECKING:
+    import pygame
+
 
 class Game:
-    """塔防原型的核心游戏类。"""
+    """塔防原型的核心游戏类。
+
+    模拟部分不依赖 pygame，pygame 只在渲染与事件处理时导入。"""
 
-    def __init__(self, screen: pygame.Surface, data_path: str = "data") -> None:
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        data_path: str = "data",
+        data: Optional[DataManager] = None,
+        limits: Optional[MemoryLimits] = None,
+    ) -> None:
         self.screen = screen
-        self.data = DataManager(data_path)
+        self.limits = limits or MemoryLimits()
+        self.data = data or DataManager(data_path)
+        self.data.max_cached_files = self.limits.max_cached_files
+        self._maintenance_timer = 0.0
+        self.fonts = FontCache(os.path.join(self.data.base_path, "saves", "font_cache.json"))
         self.entities = EntityManager()
         self.tower_brain: Optional[TowerBrain] = None
         self.tower_system: Optional[TowerSystem] = None
         self.movement_system: Optional[MovementSystem] = None
         self.cleanup_system: Optional[CleanupSystem] = None
         self.director: Optional[GameDirector] = None
-        self.hud = HUD()
+        self.hud = HUD(self.fonts)
         self.tower_table: Dict[str, Dict] = {}
         self.grid_map: Optional[GridMap] = None
         self.level_data: Dict = {}
@@ -37,30 +56,65 @@ class Game:
         self.grid_surface: Optional[pygame.Surface] = None
         self.last_reload_time: float = 0.0
         self.web_hooks: Dict[str, Callable] = {}
+        self.show_coverage: bool = False
+        self._key_map: Dict[int, str] = {}
+        self.budget = FrameBudget()
+        self._hint_label: Optional[Tuple[str, pygame.Surface]] = None
+        # 由 main 在第一帧显示后写入，用于监控启动耗时
+        self.first_frame_ms: Optional[float] = None
 
-    def setup(self, level_name: str = "level1") -> None:
-        """初始化资源、读取关卡与数据表。"""
+    def setup(self, level_name: str = "level1", level_data: Optional[Dict] = None) -> None:
+        """初始化资源、读取关卡与数据表，可直接传入调用方已加载的关卡。"""
         self.tower_table = self.data.load_table("towers")
-        self.level_data = self.data.load_level(level_name)
+        self.level_data = level_data if level_data is not None else self.data.load_level(level_name)
         self.gold = self.level_data.get("initial_gold", 100)
         self.life = self.level_data.get("initial_life", 10)
         self.initial_life = max(1, self.life)
         grid = self.level_data["grid"]
-        start = tuple(self.level_data["start"])
-        goal = tuple(self.level_data["goal"])
+        starts = [tuple(pos) for pos in self.level_data.get("starts", [])]
+        goals = [tuple(pos) for pos in self.level_data.get("goals", [])]
+        # 只声明 starts/goals 的关卡以第一项作为主出生点与终点
+        start = tuple(self.level_data["start"]) if "start" in self.level_data else starts[0]
+        goal = tuple(self.level_data["goal"]) if "goal" in self.level_data else goals[0]
         tile_size = 64
-        self.grid_map = GridMap(grid=grid, start=start, goal=goal, tile_size=tile_size)
-        self.grid_surface = self._build_grid_surface()
+        self.grid_map = GridMap(
+            grid=grid,
+            start=start,
+            goal=goal,
+            tile_size=tile_size,
+            starts=starts,
+            goals=goals,
+        )
+        self.grid_map.max_cached_paths = self.limits.max_cached_paths
+        # 关卡加载阶段完成首次寻路，第一只敌人生成时直接命中缓存
+        self.grid_map.warm_paths()
         self.tower_brain = TowerBrain(tile_size)
+        self.tower_brain.preferences.load(self._preferences_path())
+        self.entities.on_remove.append(self.tower_brain.preferences.forget)
         self.movement_system = MovementSystem(tile_size)
         damage_calc = DamageCalculator()
-        self.tower_system = TowerSystem(self.tower_brain, damage_calc, tile_size)
-        self.cleanup_system = CleanupSystem(goal, tile_size, self._on_enemy_escape)
+        self.tower_system = TowerSystem(
+            self.tower_brain,
+            damage_calc,
+            tile_size,
+            retarget_interval=self.level_data.get("retarget_interval", 4),
+        )
+        self.cleanup_system = CleanupSystem(self.grid_map.goals, tile_size, self._on_enemy_escape)
         self.director = GameDirector(self.data, self.entities, self.grid_map, self.level_data)
         # 自动开启第一波
         self.director.start_next_wave(self.get_player_life_ratio())
 
+    def _preferences_path(self) -> str:
+        return os.path.join(self.data.base_path, "saves", "tower_preferences.json")
+
+    def shutdown(self) -> None:
+        """退出前保存各类型塔学到的元素偏好，供下一局继续使用。"""
+        if self.tower_brain:
+            self.tower_brain.preferences.save(self._preferences_path())
+
     def _build_grid_surface(self) -> pygame.Surface:
+        import pygame
+
         assert self.grid_map is not None
         width = len(self.grid_map.grid[0]) * self.grid_map.tile_size
         height = len(self.grid_map.grid) * self.grid_map.tile_size
@@ -79,10 +133,13 @@ class Game:
 
     def update(self, dt: float, current_time: float) -> None:
         """主更新循环，驱动所有系统。"""
+        if self.budget.next_frame():
+            self._apply_quality()
         if not self.director or not self.grid_map:
             return
         if self.life <= 0:
             return
+        started = time.perf_counter()
         self.data.hot_reload()
         # 热加载后刷新表数据
         self.tower_table = self.data.load_table("towers")
@@ -94,42 +151,86 @@ class Game:
         if self.cleanup_system:
             self.cleanup_system.update(self.entities)
         self.director.update(dt, self.get_player_life_ratio)
+        # 同步点：统一执行本帧系统排队的实体增删
+        self.entities.commands.flush()
+        self._maintenance_timer += dt
+        if self._maintenance_timer >= self.limits.maintenance_interval:
+            self._maintenance_timer = 0.0
+            self.collect_garbage()
+        self.budget.measure_since(started)
+
+    def collect_garbage(self) -> None:
+        """清理指向已移除实体的引用：塔的学习记录与锁定目标。"""
+        if self.tower_brain:
+            self.tower_brain.preferences.prune(self.entities.is_alive)
+        for target in self.entities.targets.values():
+            if target.enemy_id is not None and not self.entities.is_alive(target.enemy_id):
+                target.enemy_id = None
+
+    def memory_report(self) -> Dict[str, Dict[str, int]]:
+        """按子系统返回内存占用（字节数与对象数），用于长时间运行的监控。"""
+        return memory_report(self)
+
+    def _apply_quality(self) -> None:
+        """把帧预算当前档位同步到各系统。"""
+        level = self.budget.level
+        if self.tower_system:
+            self.tower_system.retarget_scale = level.retarget_scale
+        self.hud.refresh_interval = level.hud_interval
 
     def render(self) -> None:
-        if not self.grid_surface:
+        import pygame
+
+        if not self.grid_map:
             return
+        started = time.perf_counter()
+        draw_extras = self.budget.level.draw_extras
+        if self.grid_surface is None:
+            self.grid_surface = self._build_grid_surface()
         self.screen.blit(self.grid_surface, (0, 0))
+        if self.show_coverage and draw_extras:
+            self.hud.draw_coverage(self.screen, self.grid_map.coverage, self.grid_map.tile_size)
         for entity_id, position in self.entities.positions.items():
             renderable = self.entities.renderables.get(entity_id)
             if not renderable:
                 continue
             pygame.draw.circle(self.screen, renderable.color, (int(position.x), int(position.y)), renderable.radius)
-        total_waves = len(self.level_data.get("waves", [])) if self.level_data else 0
+        total_waves = self.director.total_waves if self.director else 0
         current_wave = max(1, self.director.current_wave_index + 1 if self.director else 1)
         self.hud.draw(self.screen, self.gold, self.life, current_wave, total_waves)
-        self._draw_selection_hint()
+        if draw_extras:
+            self._draw_selection_hint()
         if self.life <= 0:
             self._draw_game_over()
+        self.budget.measure_since(started)
 
     def handle_event(self, event: pygame.event.Event) -> None:
+        import pygame
+
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             self._handle_build(event.pos)
         if event.type == pygame.KEYDOWN:
             self._handle_key(event.key)
 
     def _handle_key(self, key: int) -> None:
-        mapping = {
-            pygame.K_1: "physical",
-            pygame.K_2: "magic",
-            pygame.K_3: "aoe",
-            pygame.K_4: "slow",
-            pygame.K_SPACE: "next_wave",
-        }
-        if key not in mapping:
+        if not self._key_map:
+            import pygame
+
+            self._key_map = {
+                pygame.K_1: "physical",
+                pygame.K_2: "magic",
+                pygame.K_3: "aoe",
+                pygame.K_4: "slow",
+                pygame.K_SPACE: "next_wave",
+                pygame.K_h: "coverage",
+            }
+        command = self._key_map.get(key)
+        if command is None:
             return
-        command = mapping[key]
         if command == "next_wave" and self.director:
             self.director.start_next_wave(self.get_player_life_ratio())
+        elif command == "coverage":
+            self.show_coverage = not self.show_coverage
         elif command in self.tower_table:
             self.selected_tower = command
 
@@ -144,7 +245,8 @@ class Game:
         tile_x = mouse_pos[0] // self.grid_map.tile_size
         tile_y = mouse_pos[1] // self.grid_map.tile_size
         tile = (tile_x, tile_y)
-        if not self.grid_map.try_place_tower(tile):
+        dps = tower_data["damage"] * tower_data["attack_speed"]
+        if not self.grid_map.try_place_tower(tile, tower_data["range"], dps):
             return
         self.gold -= tower_data["cost"]
         entity_id = self.entities.create()
@@ -157,6 +259,7 @@ class Game:
             attack_speed=tower_data["attack_speed"],
             element=tower_data["element"],
             effects=tower_data.get("effects", []),
+            targeting=tower_data.get("targeting", "smart"),
         )
         color_map = {
             "physical": (120, 120, 200),
@@ -170,6 +273,15 @@ class Game:
         self.entities.add_component(entity_id, render)
         self.entities.add_component(entity_id, comp.Target())
 
+    def remove_tower(self, entity_id: int) -> None:
+        """拆除塔并恢复地块为可建造。"""
+        position = self.entities.positions.get(entity_id)
+        if entity_id not in self.entities.towers or position is None or not self.grid_map:
+            return
+        tile_size = self.grid_map.tile_size
+        self.grid_map.remove_tower((int(position.x // tile_size), int(position.y // tile_size)))
+        self.entities.remove(entity_id)
+
     def _on_enemy_killed(self, enemy_id: int, enemy: comp.Enemy) -> None:
         self.gold += enemy.bounty
 
@@ -184,13 +296,14 @@ class Game:
     def _draw_selection_hint(self) -> None:
         if not self.grid_map:
             return
-        font = pygame.font.SysFont("simhei", 18)
         info = f"当前选择: {self.tower_table.get(self.selected_tower, {}).get('name', self.selected_tower)}"
-        label = font.render(info, True, (200, 200, 50))
-        self.screen.blit(label, (16, 48))
+        if self._hint_label is None or self._hint_label[0] != info:
+            font = self.fonts.get("simhei", 18)
+            self._hint_label = (info, font.render(info, True, (200, 200, 50)))
+        self.screen.blit(self._hint_label[1], (16, 48))
 
     def _draw_game_over(self) -> None:
-        font = pygame.font.SysFont("simhei", 48)
+        font = self.fonts.get("simhei", 48)
         label = font.render("防线崩溃", True, (255, 80, 80))
         rect = label.get_rect(center=self.screen.get_rect().center)
         self.screen.blit(label, rect)
@@ -206,6 +319,8 @@ class Game:
             "gold": self.gold,
             "life": self.life,
             "wave": self.director.current_wave_index if self.director else 0,
+            "first_frame_ms": self.first_frame_ms,
+            "quality": self.budget.export(),
             "towers": [
                 {
                     "id": entity_id,
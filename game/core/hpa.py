@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+from .pathfinding import WALKABLE
+
+# 标志位字节 -> '1'/'0'，用于把一行格子一次性转换为位图
+_WALKABLE_DIGITS = bytes(0x31 if flag & WALKABLE else 0x30 for flag in range(256))
+
+
+class HierarchicalPathfinder:
+    """分层寻路（HPA*），面向 1000x1000 级别的大地图。
+
+    地图被切分为 cluster_size 见方的簇，相邻簇边界上的连续可通行段生成入口节点，
+    簇内入口之间的距离在构造时全部预计算（位图并行 BFS）。放塔只重建所在簇的四条边界
+    以及受影响簇的簇内距离，不会重新预处理整张地图。查询先在抽象图上搜索，再逐段细化为格子路径。"""
+
+    # 边界连续段长度达到该值时在两端各放一个入口，否则只在中点放一个
+    WIDE_ENTRANCE = 6
+
+    def __init__(self, width: int, height: int, flags: bytearray, cluster_size: int = 16) -> None:
+        self.width = width
+        self.height = height
+        self.flags = flags
+        self.cluster_size = cluster_size
+        self.clusters_x = (width + cluster_size - 1) // cluster_size
+        self.clusters_y = (height + cluster_size - 1) // cluster_size
+        cluster_count = self.clusters_x * self.clusters_y
+        # 入口节点（格子索引）-> 跨边界相邻入口
+        self.inter_edges: Dict[int, Set[int]] = {}
+        self.cluster_nodes: List[Set[int]] = [set() for _ in range(cluster_count)]
+        # 簇内入口间距离：入口 -> {同簇入口: 步数}
+        self.intra_edges: List[Dict[int, Dict[int, int]]] = [{} for _ in range(cluster_count)]
+        self.borders: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                cluster = cy * self.clusters_x + cx
+                if cx + 1 < self.clusters_x:
+                    self._build_border(cluster, cluster + 1, True)
+                if cy + 1 < self.clusters_y:
+                    self._build_border(cluster, cluster + self.clusters_x, False)
+        for cluster in range(cluster_count):
+            self.intra_edges[cluster] = self._cluster_edges(cluster)
+
+    # --- 抽象图维护 ---
+    def cluster_of(self, index: int) -> int:
+        y, x = divmod(index, self.width)
+        return (y // self.cluster_size) * self.clusters_x + x // self.cluster_size
+
+    def _cluster_bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        cy, cx = divmod(cluster, self.clusters_x)
+        x0 = cx * self.cluster_size
+        y0 = cy * self.cluster_size
+        return x0, y0, min(self.width, x0 + self.cluster_size), min(self.height, y0 + self.cluster_size)
+
+    def _border_cells(self, first: int, horizontal: bool) -> List[Tuple[int, int]]:
+        """返回边界两侧成对的格子索引，first 位于左方（horizontal）或上方。
+
+        方向必须显式传入：只有一列簇时上下相邻的簇编号同样相差 1。"""
+        x0, y0, x1, y1 = self._cluster_bounds(first)
+        if horizontal:
+            return [(y * self.width + x1 - 1, y * self.width + x1) for y in range(y0, y1)]
+        return [((y1 - 1) * self.width + x, y1 * self.width + x) for x in range(x0, x1)]
+
+    def _build_border(self, first: int, second: int, horizontal: bool) -> None:
+        transitions: List[Tuple[int, int]] = []
+        run: List[Tuple[int, int]] = []
+        for pair in self._border_cells(first, horizontal) + [(-1, -1)]:
+            if pair[0] >= 0 and self.flags[pair[0]] & WALKABLE and self.flags[pair[1]] & WALKABLE:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= self.WIDE_ENTRANCE:
+                    transitions.extend((run[0], run[-1]))
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        self.borders[(first, second)] = transitions
+        for a, b in transitions:
+            self.inter_edges.setdefault(a, set()).add(b)
+            self.inter_edges.setdefault(b, set()).add(a)
+            self.cluster_nodes[first].add(a)
+            self.cluster_nodes[second].add(b)
+
+    def _clear_border(self, first: int, second: int) -> None:
+        for a, b in self.borders.pop((first, second), []):
+            for node, other, cluster in ((a, b, first), (b, a, second)):
+                edges = self.inter_edges.get(node)
+                if edges is None:
+                    continue
+                edges.discard(other)
+                if not edges:
+                    del self.inter_edges[node]
+                    self.cluster_nodes[cluster].discard(node)
+
+    def repair(self, index: int) -> List[int]:
+        """格子可通行性变化后，只重建所在簇的边界与相关簇的簇内距离，返回被重建的簇。"""
+        cluster = self.cluster_of(index)
+        cy, cx = divmod(cluster, self.clusters_x)
+        neighbors = []
+        # (左/上簇, 右/下簇, 是否左右相邻)
+        neighbors: List[Tuple[int, int, bool]] = []
+        if cx > 0:
+            neighbors.append((cluster - 1, cluster, True))
+        if cx + 1 < self.clusters_x:
+            neighbors.append((cluster, cluster + 1, True))
+        if cy > 0:
+            neighbors.append((cluster - self.clusters_x, cluster, False))
+        if cy + 1 < self.clusters_y:
+            neighbors.append((cluster, cluster + self.clusters_x, False))
+        for first, second, _ in neighbors:
+            self._clear_border(first, second)
+        for first, second, horizontal in neighbors:
+            self._build_border(first, second, horizontal)
+        repaired = sorted({cluster}.union(*(pair[:2] for pair in neighbors)))
+        for other in repaired:
+            self.intra_edges[other] = self._cluster_edges(other)
+        return repaired
+
+    # --- 簇内搜索 ---
+    def _local_bfs(self, cluster: int, source: int, target: int = -1) -> Dict[int, int]:
+        """簇内 BFS，返回 格子 -> 父格子；给定 target 时找到即停止。"""
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        width = self.width
+        flags = self.flags
+        low = y0 * width
+        high = y1 * width
+        parents = {source: -1}
+        frontier = [source]
+        while frontier and target not in parents:
+            next_frontier = []
+            for current in frontier:
+                x = current % width
+                for neighbor, inside in (
+                    (current + 1, x + 1 < x1),
+                    (current - 1, x > x0),
+                    (current + width, current + width < high),
+                    (current - width, current - width >= low),
+                ):
+                    if inside and neighbor not in parents and flags[neighbor] & WALKABLE:
+                        parents[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return parents
+
+    def _distances(self, cluster: int, source: int, nodes: Set[int]) -> Dict[int, int]:
+        """按 BFS 层数求 source 到簇内其他入口的步数。"""
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        width = self.width
+        flags = self.flags
+        low = y0 * width
+        high = y1 * width
+        seen = {source}
+        distances: Dict[int, int] = {}
+        remaining = len(nodes) - (source in nodes)
+        frontier = [source]
+        depth = 0
+        while frontier and remaining > 0:
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                x = current % width
+                for neighbor, inside in (
+                    (current + 1, x + 1 < x1),
+                    (current - 1, x > x0),
+                    (current + width, current + width < high),
+                    (current - width, current - width >= low),
+                ):
+                    if inside and neighbor not in seen and flags[neighbor] & WALKABLE:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+                        if neighbor in nodes:
+                            distances[neighbor] = depth
+                            remaining -= 1
+            frontier = next_frontier
+        return distances
+
+    def _cluster_edges(self, cluster: int) -> Dict[int, Dict[int, int]]:
+        """求簇内全部入口两两之间的步数。
+
+        簇的可通行格压成一个位图，每个入口占一条"车道"（簇位图的一份拷贝，车道之间隔一行空位
+        防止移位串道），所有入口的 BFS 用同一组整数移位同时推进，每层只需常数次大整数运算。"""
+        nodes = sorted(self.cluster_nodes[cluster])
+        edges: Dict[int, Dict[int, int]] = {node: {} for node in nodes}
+        if len(nodes) < 2:
+            return edges
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        width = self.width
+        span = x1 - x0
+        rows = y1 - y0
+        walk = 0
+        first_column = 0
+        for row in range(rows):
+            offset = (y0 + row) * width + x0
+            bits = int(self.flags[offset:offset + span].translate(_WALKABLE_DIGITS)[::-1], 2)
+            walk |= bits << (row * span)
+            first_column |= 1 << (row * span)
+        last_column = first_column << (span - 1)
+        local = [(node // width - y0) * span + node % width - x0 for node in nodes]
+        lane = (rows + 1) * span
+        replicate = sum(1 << (order * lane) for order in range(len(nodes) - 1))
+        walk_all = walk * replicate
+        # 左移一位后落在首列、右移一位后落在末列的位属于换行，需要屏蔽
+        shift_left_mask = (walk & ~first_column) * replicate
+        shift_right_mask = (walk & ~last_column) * replicate
+        # 距离对称，车道 i 只需记录排在它之后的入口；最后一个入口无需单独搜索
+        targets = 0
+        suffix = 0
+        for order in range(len(nodes) - 2, -1, -1):
+            suffix |= 1 << local[order + 1]
+            targets |= suffix << (order * lane)
+        frontier = sum(1 << (order * lane + cell) for order, cell in enumerate(local[:-1]))
+        seen = frontier
+        cell_node = dict(zip(local, nodes))
+        depth = 0
+        while frontier and targets:
+            depth += 1
+            frontier = (
+                ((frontier << 1) & shift_left_mask)
+                | ((frontier >> 1) & shift_right_mask)
+                | (((frontier << span) | (frontier >> span)) & walk_all)
+            ) & ~seen
+            seen |= frontier
+            hits = frontier & targets
+            if not hits:
+                continue
+            targets ^= hits
+            while hits:
+                bit = hits & -hits
+                hits ^= bit
+                order, cell = divmod(bit.bit_length() - 1, lane)
+                source = nodes[order]
+                target = cell_node[cell]
+                edges[source][target] = depth
+                edges[target][source] = depth
+        return edges
+
+    def local_path(self, cluster: int, source: int, target: int) -> Optional[List[int]]:
+        """簇内最短路径（格子索引），不可达时返回 None。"""
+        parents = self._local_bfs(cluster, source, target)
+        if target not in parents:
+            return None
+        path = [target]
+        while parents[path[-1]] != -1:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
+
+    # --- 查询 ---
+    def search(self, start: int, goal: int) -> Optional[List[int]]:
+        """返回格子索引路径，不可达时返回 None。"""
+        if not self.flags[goal] & WALKABLE:
+            return None
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        if start_cluster == goal_cluster:
+            local = self.local_path(start_cluster, start, goal)
+            if local is not None:
+                return local
+        start_links = self._distances(start_cluster, start, self.cluster_nodes[start_cluster])
+        goal_links = self._distances(goal_cluster, goal, self.cluster_nodes[goal_cluster])
+        abstract = self._abstract_search(start, goal, start_links, goal_links)
+        if abstract is None:
+            return None
+        return self._refine(abstract)
+
+    def _abstract_search(
+        self,
+        start: int,
+        goal: int,
+        start_links: Dict[int, int],
+        goal_links: Dict[int, int],
+    ) -> Optional[List[int]]:
+        width = self.width
+        goal_y, goal_x = divmod(goal, width)
+        g_score: Dict[int, int] = {start: 0}
+        came_from: Dict[int, int] = {}
+        # 同 f 值时优先扩展 g 更大的节点，减少在等价路径上的横向展开
+        open_set: List[Tuple[int, int, int]] = [(0, 0, start)]
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current == goal:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
+                return path
+            base = g_score[current]
+            if current == start:
+                edges = list(start_links.items())
+            else:
+                edges = list(self.intra_edges[self.cluster_of(current)].get(current, {}).items())
+                if current in goal_links:
+                    edges.append((goal, goal_links[current]))
+            edges.extend((other, 1) for other in self.inter_edges.get(current, ()))
+            for neighbor, cost in edges:
+                tentative = base + cost
+                if tentative < g_score.get(neighbor, tentative + 1):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    ny, nx = divmod(neighbor, width)
+                    heapq.heappush(open_set, (tentative + abs(nx - goal_x) + abs(ny - goal_y), -tentative, neighbor))
+        return None
+
+    def _refine(self, abstract: List[int]) -> Optional[List[int]]:
+        path = [abstract[0]]
+        for source, target in zip(abstract, abstract[1:]):
+            if source == target:
+                continue
+            if target in self.inter_edges.get(source, ()):
+                path.append(target)
+                continue
+            segment = self.local_path(self.cluster_of(source), source, target)
+            if segment is None:
+                return None
+            path.extend(segment[1:])
+        return path
@@ -1,54 +1,239 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
 
-from .pathfinding import astar, GridPosition
+from .coverage import CoverageMap
+from .hpa import HierarchicalPathfinder
+from .pathfinding import BUILDABLE, WALKABLE, FlatPathfinder, GridPosition, tile_flags
+
+
+class GridRowView:
+    """单行的可写视图，写入会同步更新扁平存储与标志位。"""
+
+    __slots__ = ("_map", "_offset")
+
+    def __init__(self, grid_map: "GridMap", y: int) -> None:
+        self._map = grid_map
+        self._offset = y * grid_map.width
+
+    def __len__(self) -> int:
+        return self._map.width
+
+    def __getitem__(self, x: int) -> int:
+        if not 0 <= x < self._map.width:
+            raise IndexError(x)
+        return self._map.tiles[self._offset + x]
+
+    def __setitem__(self, x: int, value: int) -> None:
+        if not 0 <= x < self._map.width:
+            raise IndexError(x)
+        self._map.set_tile_index(self._offset + x, value)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._map.tiles[self._offset:self._offset + self._map.width])
+
+
+class GridView:
+    """兼容旧代码的 ``grid[y][x]`` 访问方式。"""
+
+    __slots__ = ("_map",)
+
+    def __init__(self, grid_map: "GridMap") -> None:
+        self._map = grid_map
+
+    def __len__(self) -> int:
+        return self._map.height
+
+    def __getitem__(self, y: int) -> GridRowView:
+        if not 0 <= y < self._map.height:
+            raise IndexError(y)
+        return GridRowView(self._map, y)
+
+    def __iter__(self) -> Iterator[GridRowView]:
+        return (GridRowView(self._map, y) for y in range(self._map.height))
 
 
-@dataclass
 class GridMap:
-    """网格地图，支持塔防核心操作。"""
+    """网格地图，支持塔防核心操作。
+
+    格子以行优先的扁平 ``bytearray`` 存储，另有一份预先计算的可通行/可建造标志位，
+    ``grid`` 属性保留为兼容旧调用方的嵌套列表视图。
+
+    关卡可声明多个出生点 ``starts`` 与终点 ``goals``，敌人走向最近的可达终点。
+    格子数超过 HIERARCHY_MIN_CELLS 时改用分层寻路，路径结果缓存复用：堵住某格时只处理经过该格的路径
+    （优先在所在簇内绕行），打通某格时只丢弃经过被重建簇的路径。小地图任何变化都清空缓存，
+    与逐次 A* 的结果保持一致。"""
 
-    grid: List[List[int]]
-    start: GridPosition
-    goal: GridPosition
-    tile_size: int = 64
+    HIERARCHY_MIN_CELLS = 128 * 128
+    # 路径缓存条目上限，超出时淘汰最早的条目
+    max_cached_paths = 64
+
+    def __init__(
+        self,
+        grid: Sequence[Sequence[int]],
+        start: GridPosition,
+        goal: GridPosition,
+        tile_size: int = 64,
+        starts: Optional[Sequence[GridPosition]] = None,
+        goals: Optional[Sequence[GridPosition]] = None,
+    ) -> None:
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.tiles = bytearray(tile for row in grid for tile in row)
+        self.flags = bytearray(tile_flags(tile) for tile in self.tiles)
+        self.start = start
+        self.goal = goal
+        self.starts: List[GridPosition] = [tuple(pos) for pos in starts] if starts else [start]
+        self.goals: List[GridPosition] = [tuple(pos) for pos in goals] if goals else [goal]
+        self.tile_size = tile_size
+        self.coverage = CoverageMap(self.width, self.height)
+        # 两种寻路器只创建实际使用的一种，大地图上扁平 A* 的逐格数组约占 24 MB
+        self.pathfinder: Optional[FlatPathfinder] = None
+        self.hierarchy: Optional[HierarchicalPathfinder] = None
+        if self.width * self.height >= self.HIERARCHY_MIN_CELLS:
+            self.hierarchy = HierarchicalPathfinder(self.width, self.height, self.flags)
+        else:
+            self.pathfinder = FlatPathfinder(self.width, self.height)
+        self._paths: Dict[Tuple[GridPosition, GridPosition], Optional[List[GridPosition]]] = {}
+        # 分层寻路下每条缓存路径经过的簇，用于按簇失效
+        self._path_clusters: Dict[Tuple[GridPosition, GridPosition], FrozenSet[int]] = {}
+
+    @property
+    def grid(self) -> GridView:
+        return GridView(self)
+
+    def index(self, pos: GridPosition) -> int:
+        return pos[1] * self.width + pos[0]
+
+    def position(self, index: int) -> GridPosition:
+        y, x = divmod(index, self.width)
+        return (x, y)
+
+    def set_tile_index(self, index: int, value: int) -> None:
+        self.tiles[index] = value
+        flags = tile_flags(value)
+        changed = flags ^ self.flags[index]
+        self.flags[index] = flags
+        if not changed & WALKABLE:
+            return
+        if self.hierarchy is None:
+            self._paths.clear()
+            return
+        repaired = self.hierarchy.repair(index)
+        if flags & WALKABLE:
+            self._open_paths(repaired)
+        else:
+            self._block_paths(index)
+
+    def _forget_path(self, key: Tuple[GridPosition, GridPosition]) -> None:
+        del self._paths[key]
+        self._path_clusters.pop(key, None)
+
+    def _block_paths(self, index: int) -> None:
+        """某格变为不可通行：经过它的路径先尝试簇内绕行，失败再丢弃。"""
+        assert self.hierarchy is not None
+        pos = self.position(index)
+        cluster = self.hierarchy.cluster_of(index)
+        for key, path in list(self._paths.items()):
+            if path is None or cluster not in self._path_clusters[key] or pos not in path:
+                continue
+            detour = self._detour(path, path.index(pos), cluster)
+            # 绕行后的路径可能仍在别处经过该格（路径自交），此时放弃绕行
+            if detour is None or pos in detour:
+                self._forget_path(key)
+            else:
+                self._paths[key] = detour
+
+    def _open_paths(self, repaired: Sequence[int]) -> None:
+        """某格变为可通行：不可达记录与经过被重建簇的路径需要重新搜索。"""
+        touched = set(repaired)
+        for key, path in list(self._paths.items()):
+            if path is None or not touched.isdisjoint(self._path_clusters[key]):
+                self._forget_path(key)
+
+    def _detour(self, path: List[GridPosition], at: int, cluster: int) -> Optional[List[GridPosition]]:
+        """把路径在该簇内的连续一段替换为簇内最短路，被堵格位于入口/出口时返回 None。"""
+        assert self.hierarchy is not None
+        cluster_of = self.hierarchy.cluster_of
+        first = at
+        while first > 0 and cluster_of(self.index(path[first - 1])) == cluster:
+            first -= 1
+        last = at
+        while last + 1 < len(path) and cluster_of(self.index(path[last + 1])) == cluster:
+            last += 1
+        if first == at or last == at:
+            return None
+        segment = self.hierarchy.local_path(cluster, self.index(path[first]), self.index(path[last]))
+        if segment is None:
+            return None
+        return path[:first] + [self.position(index) for index in segment] + path[last + 1:]
 
     def in_bounds(self, pos: GridPosition) -> bool:
         x, y = pos
-        return 0 <= y < len(self.grid) and 0 <= x < len(self.grid[0])
+        return 0 <= y < self.height and 0 <= x < self.width
 
     def is_walkable(self, pos: GridPosition) -> bool:
         """1 表示障碍，其他值可通行。"""
         if not self.in_bounds(pos):
             return False
-        x, y = pos
-        return self.grid[y][x] != 1
+        return bool(self.flags[self.index(pos)] & WALKABLE)
 
     def is_buildable(self, pos: GridPosition) -> bool:
         """0 表示可建造，路径与障碍不可建塔。"""
         if not self.in_bounds(pos):
             return False
-        x, y = pos
-        return self.grid[y][x] == 0
+        return bool(self.flags[self.index(pos)] & BUILDABLE)
+
+    def find_path(self, start: Optional[GridPosition] = None) -> Optional[List[GridPosition]]:
+        """返回从出生点到最近可达终点的路径，默认使用第一个出生点。
 
-    def find_path(self) -> Optional[List[GridPosition]]:
-        return astar(self.grid, self.start, self.goal)
+        返回的是缓存中的共享列表，同一路线上的敌人共用一份，调用方不应修改。"""
+        start = self.start if start is None else start
+        best: Optional[List[GridPosition]] = None
+        for goal in self.goals:
+            path = self.path_between(start, goal)
+            if path is not None and (best is None or len(path) < len(best)):
+                best = path
+        return best
 
-    def try_place_tower(self, pos: GridPosition) -> bool:
-        """尝试放置塔，确保不阻断路径。"""
+    def path_between(self, start: GridPosition, goal: GridPosition) -> Optional[List[GridPosition]]:
+        key = (start, goal)
+        if key in self._paths:
+            return self._paths[key]
+        if self.hierarchy is not None:
+            indices = self.hierarchy.search(self.index(start), self.index(goal))
+        else:
+            assert self.pathfinder is not None
+            indices = self.pathfinder.search(self.flags, self.index(start), self.index(goal))
+        path = None if indices is None else [self.position(index) for index in indices]
+        while len(self._paths) >= max(1, self.max_cached_paths):
+            self._forget_path(next(iter(self._paths)))
+        self._paths[key] = path
+        if self.hierarchy is not None:
+            self._path_clusters[key] = frozenset(map(self.hierarchy.cluster_of, indices or ()))
+        return path
+
+    def warm_paths(self) -> None:
+        """预先计算全部出生点的路径，在关卡加载、波次间隙与改动地形后调用，避免在生成敌人时搜索。"""
+        for start in self.starts:
+            self.find_path(start)
+
+    def try_place_tower(self, pos: GridPosition, tower_range: float = 0.0, dps: float = 0.0) -> bool:
+        """尝试放置塔，确保不阻断路径；成功时同时登记到覆盖图，射程以格为单位。"""
         if not self.is_buildable(pos):
             return False
-        x, y = pos
-        self.grid[y][x] = 1
-        path = self.find_path()
-        if path is None:
-            self.grid[y][x] = 0
+        index = self.index(pos)
+        self.set_tile_index(index, 1)
+        if any(self.find_path(start) is None for start in self.starts):
+            self.set_tile_index(index, 0)
+            self.warm_paths()
             return False
+        self.coverage.add_tower(pos, tower_range, dps)
         return True
 
     def remove_tower(self, pos: GridPosition) -> None:
-        x, y = pos
-        if self.in_bounds(pos) and self.grid[y][x] == 1:
-            self.grid[y][x] = 0
+        """拆除塔：地块恢复为可建造，并从覆盖图中移除。"""
+        if self.in_bounds(pos) and self.tiles[self.index(pos)] == 1:
+            self.set_tile_index(self.index(pos), 0)
+            self.coverage.remove_tower(pos)
+            self.warm_paths()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sys
+import types
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set
+
+# 不计入统计的共享对象类型（模块、类、函数等）
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+_ATOMIC_TYPES = (int, float, bool, str, bytes, type(None), array, bytearray)
+
+
+@dataclass
+class MemoryLimits:
+    """长时间运行时各缓存的上限与清理周期。"""
+
+    # DataManager 最多缓存的 JSON 文件数
+    max_cached_files: int = 32
+    # GridMap 最多缓存的 (起点, 终点) 路径数
+    max_cached_paths: int = 64
+    # 清理过期偏好与目标引用的周期（模拟秒）
+    maintenance_interval: float = 10.0
+
+
+class SizeCounter:
+    """递归统计对象占用的字节数与对象个数，同一对象只计一次。
+
+    多个子系统共享同一对象（例如敌人共享的路径列表）时，先统计到的子系统计入，
+    因此各项之和不会重复计算。"""
+
+    def __init__(self) -> None:
+        self.seen: Set[int] = set()
+
+    def measure(self, *roots: Any) -> Dict[str, int]:
+        total_bytes = 0
+        objects = 0
+        stack = list(roots)
+        while stack:
+            obj = stack.pop()
+            if obj is None or isinstance(obj, _SKIP_TYPES) or id(obj) in self.seen:
+                continue
+            self.seen.add(id(obj))
+            objects += 1
+            total_bytes += self._own_size(obj)
+            if isinstance(obj, _ATOMIC_TYPES):
+                continue
+            stack.extend(self._children(obj))
+        return {"bytes": total_bytes, "objects": objects}
+
+    @staticmethod
+    def _own_size(obj: Any) -> int:
+        get_size = getattr(obj, "get_size", None)
+        get_bytesize = getattr(obj, "get_bytesize", None)
+        if callable(get_size) and callable(get_bytesize):
+            # pygame.Surface：按像素缓冲计算
+            width, height = get_size()
+            return sys.getsizeof(obj) + width * height * get_bytesize()
+        return sys.getsizeof(obj)
+
+    @staticmethod
+    def _children(obj: Any) -> Iterable[Any]:
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                yield key
+                yield value
+            return
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            yield from obj
+            return
+        if hasattr(obj, "__dict__"):
+            yield obj.__dict__
+        for slot in getattr(type(obj), "__slots__", ()):
+            yield getattr(obj, slot, None)
+
+
+def memory_report(game: Any, counter: Optional[SizeCounter] = None) -> Dict[str, Dict[str, int]]:
+    """按子系统统计游戏对象的内存占用：ECS 存储、路径、AI 状态、数据缓存与渲染缓存。"""
+    counter = counter or SizeCounter()
+    entities = game.entities
+    report: Dict[str, Dict[str, int]] = {}
+    # 路径先于 ECS 统计，敌人共享的路径列表计入 paths
+    path_roots = [enemy.path for enemy in entities.enemies.values()]
+    if game.grid_map is not None:
+        path_roots.extend([game.grid_map._paths, game.grid_map.hierarchy, game.grid_map.pathfinder])
+    report["paths"] = counter.measure(*path_roots)
+    report["ecs"] = counter.measure(
+        entities.positions,
+        entities.renderables,
+        entities.combats,
+        entities.towers,
+        entities.enemies,
+        entities.effects,
+        entities.targets,
+        entities._owned,
+        entities._generations,
+        entities._free_slots,
+        entities.commands._commands,
+        entities.commands.pending_destroy,
+        entities.commands.pending_create,
+    )
+    ai_roots = [entities.enemy_index]
+    if game.tower_brain is not None:
+        ai_roots.append(game.tower_brain.preferences)
+    if game.director is not None:
+        ai_roots.extend([game.director.enemy_ai, game.director.timeline, game.director.upcoming])
+    report["ai"] = counter.measure(*ai_roots)
+    report["data_cache"] = counter.measure(game.data.cache, game.data.mtimes)
+    report["map"] = counter.measure(game.grid_map)
+    report["render"] = counter.measure(game.fonts, game.hud, game.grid_surface, game._hint_label)
+    report["total"] = {
+        "bytes": sum(item["bytes"] for item in report.values()),
+        "objects": sum(item["objects"] for item in report.values()),
+    }
+    return report
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import heapq
+from array import array
 from typing import Dict, List, Tuple, Optional
 
 GridPosition = Tuple[int, int]
@@ -45,3 +46,80 @@ def astar(grid: List[List[int]], start: GridPosition, goal: GridPosition) -> Opt
                 f_score = tentative + heuristic(neighbor, goal)
                 heapq.heappush(open_set, (f_score, neighbor))
     return None
+
+
+# 扁平网格的格子标志位
+WALKABLE = 0x1
+BUILDABLE = 0x2
+
+
+def tile_flags(tile: int) -> int:
+    """1 为障碍，0 为可建造空地，其余值（如 2 路径）仅可通行。"""
+    if tile == 1:
+        return 0
+    if tile == 0:
+        return WALKABLE | BUILDABLE
+    return WALKABLE
+
+
+class FlatPathfinder:
+    """基于扁平索引的 A*，分数数组预先分配并通过代数标记复用，查询间无需清零。"""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        size = width * height
+        self.g_score = array("l", [0]) * size
+        self.came_from = array("l", [-1]) * size
+        self.stamp = array("L", [0]) * size
+        self.generation = 0
+
+    def search(self, flags: bytearray, start: int, goal: int) -> Optional[List[int]]:
+        """返回从 start 到 goal 的格子索引列表，不可达时返回 None。"""
+        width = self.width
+        size = width * self.height
+        g_score = self.g_score
+        came_from = self.came_from
+        stamp = self.stamp
+        self.generation += 1
+        generation = self.generation
+
+        height = self.height
+        goal_y, goal_x = divmod(goal, width)
+        stamp[start] = generation
+        g_score[start] = 0
+        came_from[start] = -1
+        # 堆元素编码为 f * size + x * height + y 的单个整数，
+        # 同分时按 (x, y) 排序，与 astar 的元组堆出队顺序一致
+        start_y, start_x = divmod(start, width)
+        open_set: List[int] = [start_x * height + start_y]
+
+        while open_set:
+            order = heapq.heappop(open_set) % size
+            x, y = divmod(order, height)
+            current = y * width + x
+            if current == goal:
+                path = [current]
+                while came_from[current] != -1:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
+                return path
+            tentative = g_score[current] + 1
+            for neighbor in (
+                current + 1 if x + 1 < width else -1,
+                current - 1 if x > 0 else -1,
+                current + width if current + width < size else -1,
+                current - width,
+            ):
+                if neighbor < 0 or not flags[neighbor] & WALKABLE:
+                    continue
+                if stamp[neighbor] == generation and tentative >= g_score[neighbor]:
+                    continue
+                stamp[neighbor] = generation
+                g_score[neighbor] = tentative
+                came_from[neighbor] = current
+                ny, nx = divmod(neighbor, width)
+                f_score = tentative + abs(nx - goal_x) + abs(ny - goal_y)
+                heapq.heappush(open_set, f_score * size + nx * height + ny)
+        return None
@@ -1,15 +1,59 @@
 from __future__ import annotations
 
-import pygame
+from typing import TYPE_CHECKING, Optional
+
+from .assets import FontCache
+from .coverage import CoverageMap
+
+if TYPE_CHECKING:
+    import pygame
 
 
 class HUD:
-    """基础 HUD，用于展示资源、生命与波次信息。"""
+    """基础 HUD，用于展示资源、生命与波次信息。
+
+    pygame 只在首次绘制时导入，字体从 FontCache 取得。"""
+
+    def __init__(self, fonts: Optional[FontCache] = None) -> None:
+        self.fonts = fonts or FontCache()
+        # 文字每隔 refresh_interval 帧才重新排版，帧预算降档时调大
+        self.refresh_interval = 1
+        self._frames_since_refresh = 0
+        self._label: Optional[pygame.Surface] = None
+        self._label_text = ""
+        # 热力图按覆盖图版本缓存，塔未变化时直接复用
+        self._coverage_version = -1
+        self._coverage_overlay: Optional[pygame.Surface] = None
+
+    def draw(self, surface: pygame.Surface, gold: int, life: int, wave: int, total_waves: Optional[int]) -> None:
+        total = "∞" if total_waves is None else total_waves
+        text = f"金币: {gold}    生命: {life}    波次: {wave}/{total}"
+        self._frames_since_refresh += 1
+        stale = text != self._label_text and self._frames_since_refresh >= self.refresh_interval
+        if self._label is None or stale:
+            self._label = self.fonts.get("simhei", 20).render(text, True, (255, 255, 255))
+            self._label_text = text
+            self._frames_since_refresh = 0
+        surface.blit(self._label, (16, 16))
+
+    def draw_coverage(self, surface: pygame.Surface, coverage: CoverageMap, tile_size: int) -> None:
+        """以半透明热力图显示每格的期望 DPS。"""
+        if coverage.max_dps <= 0:
+            return
+        if self._coverage_overlay is None or self._coverage_version != coverage.version:
+            self._coverage_overlay = self._build_coverage_overlay(coverage, tile_size)
+            self._coverage_version = coverage.version
+        surface.blit(self._coverage_overlay, (0, 0))
 
-    def __init__(self) -> None:
-        self.font = pygame.font.SysFont("simhei", 20)
+    def _build_coverage_overlay(self, coverage: CoverageMap, tile_size: int) -> pygame.Surface:
+        import pygame
 
-    def draw(self, surface: pygame.Surface, gold: int, life: int, wave: int, total_waves: int) -> None:
-        text = f"金币: {gold}    生命: {life}    波次: {wave}/{total_waves}"
-        label = self.font.render(text, True, (255, 255, 255))
-        surface.blit(label, (16, 16))
+        overlay = pygame.Surface((coverage.width * tile_size, coverage.height * tile_size), pygame.SRCALPHA)
+        for index, dps in enumerate(coverage.dps):
+            if dps <= 0:
+                continue
+            heat = min(1.0, dps / coverage.max_dps)
+            y, x = divmod(index, coverage.width)
+            color = (int(255 * heat), int(200 * (1.0 - heat)), 40, 90)
+            overlay.fill(color, pygame.Rect(x * tile_size, y * tile_size, tile_size, tile_size))
+        return overlay
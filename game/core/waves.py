@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import heapq
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+
+@dataclass
+class WaveEnemy:
+    """波次中的一组敌人：从 delay 秒开始，每隔 interval 秒生成一只。"""
+
+    enemy_type: str
+    count: int
+    interval: float
+    delay: float = 0.0
+
+
+class SpawnTimeline:
+    """将一波敌人编译为按时间排序的生成时间线。
+
+    堆中每组只保留下一次生成时间，内存与组数成正比而不是与敌人总数成正比，
+    每帧只处理已到期的生成事件，代价为 O(到期数 * log 组数)。"""
+
+    def __init__(self, groups: Sequence[WaveEnemy]) -> None:
+        self.groups = list(groups)
+        self.elapsed = 0.0
+        self._remaining: List[int] = [group.count for group in self.groups]
+        self._heap: List[Tuple[float, int]] = [
+            (group.delay, order) for order, group in enumerate(self.groups) if group.count > 0
+        ]
+        heapq.heapify(self._heap)
+
+    @property
+    def finished(self) -> bool:
+        return not self._heap
+
+    def advance(self, dt: float) -> List[str]:
+        """推进时间并返回本帧需要生成的敌人类型。"""
+        self.elapsed += dt
+        due: List[str] = []
+        heap = self._heap
+        while heap and heap[0][0] <= self.elapsed:
+            spawn_time, order = heapq.heappop(heap)
+            group = self.groups[order]
+            due.append(group.enemy_type)
+            self._remaining[order] -= 1
+            if self._remaining[order] > 0:
+                heapq.heappush(heap, (spawn_time + group.interval, order))
+        return due
+
+
+class WaveGenerator:
+    """无尽模式的程序化波次生成器，依据敌人表与自适应难度分配预算。"""
+
+    BASE_BUDGET = 6.0
+    BUDGET_GROWTH = 0.15
+    MAX_GROUPS = 8
+    # 单波威胁预算上限，保证无尽模式下场上敌人数量有界
+    MAX_BUDGET = 400.0
+
+    def __init__(self, enemy_table: Dict[str, Dict], seed: int = 0) -> None:
+        self.enemy_table = enemy_table
+        self.seed = seed
+
+    def enemy_cost(self, template: Dict) -> float:
+        """以生命、速度与防御估算单只敌人的威胁值，步兵约为 1。"""
+        toughness = template["health"] * (1.0 + (template["armor"] + template["resistance"]) * 0.02)
+        return max(0.1, toughness * template["speed"] / 110.0)
+
+    def budget(self, wave_index: int, difficulty_score: float) -> float:
+        """第 wave_index 波的威胁预算，达到 MAX_BUDGET 后不再增长。"""
+        budget = self.BASE_BUDGET * (1.0 + wave_index * self.BUDGET_GROWTH) * max(0.1, difficulty_score)
+        return min(self.MAX_BUDGET, budget)
+
+    def generate(self, wave_index: int, difficulty_score: float) -> List[WaveEnemy]:
+        rng = random.Random(self.seed * 100003 + wave_index)
+        budget = self.budget(wave_index, difficulty_score)
+        types = sorted(self.enemy_table)
+        group_count = min(self.MAX_GROUPS, 1 + wave_index // 3, len(types) * 2)
+        groups: List[WaveEnemy] = []
+        delay = 0.0
+        for group_index in range(group_count):
+            enemy_type = rng.choice(types)
+            cost = self.enemy_cost(self.enemy_table[enemy_type])
+            share = budget / (group_count - group_index)
+            count = max(1, int(share / cost))
+            budget -= count * cost
+            interval = rng.uniform(0.05, 0.12)
+            groups.append(WaveEnemy(enemy_type=enemy_type, count=count, interval=interval, delay=delay))
+            delay += rng.uniform(0.0, 0.5)
+        return groups
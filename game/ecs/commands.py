@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from .entities import EntityManager
+
+
+class CommandBuffer:
+    """延迟命令缓冲：系统更新期间记录创建、销毁与组件添加，在每帧同步点统一执行。
+
+    被标记销毁的实体立即对 ``EntityManager.is_alive`` 不可见，
+    因此同一帧后续的塔不会再选中已死亡的敌人，但存储直到 flush 时才真正修改。"""
+
+    def __init__(self, entities: "EntityManager") -> None:
+        self.entities = entities
+        self._commands: List[Tuple[str, int, object]] = []
+        self.pending_destroy: Set[int] = set()
+        # 已分配 ID、尚未在同步点登记的实体
+        self.pending_create: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def create(self) -> int:
+        """立即分配 ID 以便后续 add 引用，实体与组件在同步点才登记到存储中。"""
+        entity_id = self.entities.reserve()
+        self.pending_create.add(entity_id)
+        self._commands.append(("create", entity_id, None))
+        return entity_id
+
+    def add(self, entity_id: int, component: object) -> None:
+        self._commands.append(("add", entity_id, component))
+
+    def destroy(self, entity_id: int) -> None:
+        if entity_id in self.pending_destroy:
+            return
+        self.pending_destroy.add(entity_id)
+        # 有序索引立即剔除，选靶策略不必额外检查
+        self.entities.enemy_index.discard(entity_id)
+        self._commands.append(("destroy", entity_id, None))
+
+    def flush(self) -> None:
+        """按记录顺序执行全部命令；针对已销毁或过期 ID 的添加会被忽略。"""
+        commands = self._commands
+        self._commands = []
+        entities = self.entities
+        for kind, entity_id, component in commands:
+            if kind == "create":
+                entities.activate(entity_id)
+            elif kind == "add":
+                if entities.exists(entity_id):
+                    entities.add_component(entity_id, component)
+            else:
+                entities.remove(entity_id)
+        self.pending_create.clear()
+        self.pending_destroy.clear()
@@ -39,6 +39,8 @@ class Tower:
     effects: List[str]
     cooldown: float = 0.0
     experience: float = 0.0
+    # 选靶策略：smart（偏好评分）/first/last/strongest/weakest
+    targeting: str = "smart"
 
 
 @dataclass
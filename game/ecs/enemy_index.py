@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+GridPosition = Tuple[int, int]
+# 进度区间 [low, high)：敌人位于该区间时处在某座塔射程内
+Span = Tuple[float, float]
+
+
+class ProgressLane:
+    """共用同一条路径的敌人，按路径进度排序。
+
+    敌人的坐标只由 ``path_index`` 决定，因此塔的射程在路径上对应若干进度区间，
+    区间按 (塔坐标, 射程) 缓存，路线上没有敌人后随车道一起释放。"""
+
+    __slots__ = ("path", "entries", "_spans")
+
+    def __init__(self, path: Sequence[GridPosition]) -> None:
+        self.path = path
+        self.entries: List[Tuple[float, int]] = []
+        self._spans: Dict[Tuple[float, float, float], List[Span]] = {}
+
+    def spans(self, x: float, y: float, radius: float, tile_size: int) -> List[Span]:
+        key = (x, y, radius)
+        spans = self._spans.get(key)
+        if spans is None:
+            spans = []
+            half = tile_size / 2
+            limit = radius * radius
+            for path_index, (tile_x, tile_y) in enumerate(self.path):
+                dx = tile_x * tile_size + half - x
+                dy = tile_y * tile_size + half - y
+                if dx * dx + dy * dy > limit:
+                    continue
+                if spans and spans[-1][1] == path_index:
+                    spans[-1] = (spans[-1][0], path_index + 1)
+                else:
+                    spans.append((path_index, path_index + 1))
+            self._spans[key] = spans
+        return spans
+
+
+class EnemyIndex:
+    """按路径进度排序的存活敌人索引，按路线分车道维护。
+
+    由实体管理器在敌人加入/移除时维护，移动系统每帧增量更新进度；相对顺序不变时原地替换，
+    只需一次 O(log n) 的二分查找。选靶时把塔的射程换算为进度区间并二分定位，
+    不再逐个计算射程外敌人的距离。"""
+
+    def __init__(self) -> None:
+        # 以路径列表的身份区分车道，同一路线上的敌人共用缓存中的同一份路径
+        self._lanes: Dict[int, ProgressLane] = {}
+        self._entries: Dict[int, Tuple[ProgressLane, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, enemy_id: int) -> bool:
+        return enemy_id in self._entries
+
+    def lanes(self) -> Iterator[ProgressLane]:
+        return iter(self._lanes.values())
+
+    def add(self, enemy_id: int, progress: float, path: Sequence[GridPosition]) -> None:
+        self.discard(enemy_id)
+        lane = self._lanes.get(id(path))
+        if lane is None:
+            lane = ProgressLane(path)
+            self._lanes[id(path)] = lane
+        self._entries[enemy_id] = (lane, progress)
+        insort(lane.entries, (progress, enemy_id))
+
+    def discard(self, enemy_id: int) -> None:
+        entry = self._entries.pop(enemy_id, None)
+        if entry is None:
+            return
+        lane, progress = entry
+        entries = lane.entries
+        index = bisect_left(entries, (progress, enemy_id))
+        if index < len(entries) and entries[index][1] == enemy_id:
+            del entries[index]
+        if not entries:
+            del self._lanes[id(lane.path)]
+
+    def update_progress(self, enemy_id: int, progress: float) -> None:
+        """路径进度 = path_index + progress，仅在值变化时调整位置。"""
+        entry = self._entries.get(enemy_id)
+        if entry is None or entry[1] == progress:
+            return
+        lane, old = entry
+        self._entries[enemy_id] = (lane, progress)
+        entries = lane.entries
+        index = bisect_left(entries, (old, enemy_id))
+        new_entry = (progress, enemy_id)
+        # 大多数帧相邻敌人的先后不变，原地替换即可
+        if (index == 0 or entries[index - 1] < new_entry) and (
+            index + 1 == len(entries) or new_entry < entries[index + 1]
+        ):
+            entries[index] = new_entry
+            return
+        del entries[index]
+        insort(entries, new_entry)
+
+    def in_range(self, x: float, y: float, radius: float, tile_size: int) -> Iterator[int]:
+        """遍历坐标 (x, y) 半径 radius 内的敌人，代价为 O(区间数 * log n + 结果数)。"""
+        for lane in self.lanes():
+            entries = lane.entries
+            for low, high in lane.spans(x, y, radius, tile_size):
+                index = bisect_left(entries, (low, -1))
+                while index < len(entries) and entries[index][0] < high:
+                    yield entries[index][1]
+                    index += 1
+
+    def first_in_range(
+        self, x: float, y: float, radius: float, tile_size: int, reverse: bool = False
+    ) -> Optional[int]:
+        """射程内路径进度最小的敌人，reverse=True 时取进度最大（最接近终点）的敌人。"""
+        best: Optional[Tuple[float, int]] = None
+        for lane in self.lanes():
+            entries = lane.entries
+            spans = lane.spans(x, y, radius, tile_size)
+            candidate: Optional[Tuple[float, int]] = None
+            if reverse:
+                for low, high in reversed(spans):
+                    index = bisect_left(entries, (high, -1)) - 1
+                    if index >= 0 and entries[index][0] >= low:
+                        candidate = entries[index]
+                        break
+            else:
+                for low, high in spans:
+                    index = bisect_left(entries, (low, -1))
+                    if index < len(entries) and entries[index][0] < high:
+                        candidate = entries[index]
+                        break
+            if candidate is None:
+                continue
+            if best is None or (candidate[0] > best[0] if reverse else candidate[0] < best[0]):
+                best = candidate
+        return None if best is None else best[1]
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Type, TypeVar, Generic, Optional
+from typing import Any, Callable, Dict, List, Type, TypeVar, Generic, Optional
 
 from . import components as comp
+from .commands import CommandBuffer
+from .enemy_index import EnemyIndex
 
 T = TypeVar("T")
 
+# 实体 ID = 代数 << INDEX_BITS | 槽位，槽位回收后代数递增，旧 ID 随之失效
+INDEX_BITS = 20
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+
+def entity_slot(entity_id: int) -> int:
+    return entity_id & INDEX_MASK
+
+
+def entity_generation(entity_id: int) -> int:
+    return entity_id >> INDEX_BITS
+
 
 class EntityManager:
-    """简单的实体管理器，负责组件的增删改查。"""
+    """简单的实体管理器，负责组件的增删改查。
+
+    ID 带代数标记并回收槽位，持有旧 ID 的引用可通过 ``is_alive`` 识别失效；
+    系统更新中的增删通过 ``commands`` 排队，在每帧同步点统一执行。"""
 
     def __init__(self) -> None:
-        self._next_id = 1
+        # 槽位 0 保留，保证 ID 从 1 开始
+        self._generations: List[int] = [0]
+        self._free_slots: List[int] = []
+        # 实体 ID -> 已挂载组件所在的存储，移除时只需访问这些存储
+        self._owned: Dict[int, List[Dict[int, Any]]] = {}
         self.positions: Dict[int, comp.Position] = {}
         self.renderables: Dict[int, comp.Renderable] = {}
         self.combats: Dict[int, comp.CombatStats] = {}
@@ -20,44 +41,91 @@ class EntityManager:
         self.enemies: Dict[int, comp.Enemy] = {}
         self.effects: Dict[int, comp.Effects] = {}
         self.targets: Dict[int, comp.Target] = {}
+        self.enemy_index = EnemyIndex()
+        self.commands = CommandBuffer(self)
+        # 实体被真正移除时的回调，如清理塔的学习记录
+        self.on_remove: List[Callable[[int], None]] = []
+
+    def reserve(self) -> int:
+        """分配 ID 但暂不登记，供命令缓冲延迟创建；登记前 ``exists`` 返回 False。"""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._generations)
+            if slot > INDEX_MASK:
+                raise OverflowError("实体槽位已耗尽")
+            self._generations.append(0)
+        return (self._generations[slot] << INDEX_BITS) | slot
+
+    def activate(self, entity_id: int) -> None:
+        """登记 reserve 得到的 ID，之后才能挂载组件；槽位已被回收的旧 ID 会被拒绝。"""
+        if self._generations[entity_slot(entity_id)] != entity_generation(entity_id):
+            raise KeyError(f"实体不存在或已失效: {entity_id}")
+        self._owned.setdefault(entity_id, [])
 
     def create(self) -> int:
-        entity_id = self._next_id
-        self._next_id += 1
+        entity_id = self.reserve()
+        self.activate(entity_id)
         return entity_id
 
+    def exists(self, entity_id: int) -> bool:
+        """ID 仍有效（包括本帧已标记销毁、尚未同步的实体）。"""
+        return entity_id in self._owned
+
+    def is_alive(self, entity_id: Optional[int]) -> bool:
+        """ID 有效且未被标记销毁，可用于检测过期的目标引用。"""
+        return entity_id in self._owned and entity_id not in self.commands.pending_destroy
+
     def remove(self, entity_id: int) -> None:
-        for storage in [
-            self.positions,
-            self.renderables,
-            self.combats,
-            self.towers,
-            self.enemies,
-            self.effects,
-            self.targets,
-        ]:
+        """立即移除实体并回收槽位；系统更新中请使用 ``commands.destroy``。"""
+        owned = self._owned.pop(entity_id, None)
+        if owned is None:
+            return
+        self.enemy_index.discard(entity_id)
+        for storage in owned:
             storage.pop(entity_id, None)
+        slot = entity_slot(entity_id)
+        self._generations[slot] += 1
+        self._free_slots.append(slot)
+        for callback in self.on_remove:
+            callback(entity_id)
+
+    def _track(self, entity_id: int, storage: Dict[int, Any]) -> None:
+        owned = self._owned[entity_id]
+        if not any(existing is storage for existing in owned):
+            owned.append(storage)
 
     def add_component(self, entity_id: int, component: object) -> None:
-        """根据组件类型分类存储。"""
+        """根据组件类型分类存储，已移除或未登记的 ID 会被拒绝。"""
+        if entity_id not in self._owned:
+            raise KeyError(f"实体不存在或已失效: {entity_id}")
         if isinstance(component, comp.Position):
             self.positions[entity_id] = component
+            self._track(entity_id, self.positions)
         elif isinstance(component, comp.Renderable):
             self.renderables[entity_id] = component
+            self._track(entity_id, self.renderables)
         elif isinstance(component, comp.CombatStats):
             self.combats[entity_id] = component
+            self._track(entity_id, self.combats)
         elif isinstance(component, comp.Tower):
             self.towers[entity_id] = component
+            self._track(entity_id, self.towers)
         elif isinstance(component, comp.Enemy):
             self.enemies[entity_id] = component
+            self._track(entity_id, self.enemies)
+            self.enemy_index.add(entity_id, component.path_index + component.progress, component.path)
         elif isinstance(component, comp.Effects):
             self.effects[entity_id] = component
+            self._track(entity_id, self.effects)
         elif isinstance(component, comp.Target):
             self.targets[entity_id] = component
+            self._track(entity_id, self.targets)
         elif isinstance(component, comp.SlowStatus):
             # 减速状态需要依附在 Effects 上，若不存在则创建
             effects = self.effects.setdefault(entity_id, comp.Effects())
             effects.slows.append(component)
+            self._track(entity_id, self.effects)
         else:
             raise TypeError(f"未知组件类型: {type(component)!r}")
 
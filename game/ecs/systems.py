@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import math
-from typing import List, Tuple, Callable
+from typing import List, Sequence, Tuple, Callable
 
-from .entities import EntityManager
+from .entities import EntityManager, entity_slot
 from . import components as comp
 from game.ai.tower_ai import TowerBrain
 from game.core.combat import DamageCalculator
@@ -37,67 +37,118 @@ class MovementSystem:
                 enemy.progress -= 1.0
                 enemy.path_index += 1
             enemy.progress = min(enemy.progress, 0.999)
+            entities.enemy_index.update_progress(enemy_id, enemy.path_index + enemy.progress)
             tile_x, tile_y = enemy.path[enemy.path_index]
             position.x = tile_x * self.grid_size + self.grid_size / 2
             position.y = tile_y * self.grid_size + self.grid_size / 2
 
 
 class TowerSystem:
-    """塔攻击系统，调度塔 AI 完成选靶并执行伤害。"""
+    """塔攻击系统，调度塔 AI 完成选靶并执行伤害。
 
-    def __init__(self, tower_ai: TowerBrain, damage_calc: DamageCalculator, grid_size: int) -> None:
+    目标以 ``Target`` 组件为准且具有粘性：目标存活且仍在射程内时继续攻击，
+    完整的重新选靶按槽位轮转，每 retarget_interval * retarget_scale 帧轮到一次；
+    没有目标的塔同样按此周期索敌，只有目标刚失效的那一帧会立即补选。"""
+
+    def __init__(
+        self,
+        tower_ai: TowerBrain,
+        damage_calc: DamageCalculator,
+        grid_size: int,
+        retarget_interval: int = 4,
+    ) -> None:
         self.tower_ai = tower_ai
         self.damage_calc = damage_calc
         self.grid_size = grid_size
+        self.retarget_interval = retarget_interval
+        # 帧预算降档时调大，进一步拉长轮转周期
+        self.retarget_scale = 1
+        self._frame = 0
+
+    def _current_target(
+        self,
+        tower: comp.Tower,
+        position: comp.Position,
+        target: comp.Target,
+        entities: EntityManager,
+    ) -> bool:
+        """校验粘性目标：已死亡或离开射程时清空并返回 False。"""
+        if not entities.is_alive(target.enemy_id):
+            target.enemy_id = None
+            return False
+        target_position = entities.positions.get(target.enemy_id)
+        if target_position is None or math.dist(
+            (position.x, position.y), (target_position.x, target_position.y)
+        ) > tower.range * self.grid_size:
+            target.enemy_id = None
+            return False
+        return True
 
     def update(self, dt: float, entities: EntityManager, on_enemy_killed: Callable[[int, comp.Enemy], None]) -> None:
+        self._frame += 1
+        interval = max(1, self.retarget_interval * self.retarget_scale)
         for tower_id, tower in entities.towers.items():
             tower.cooldown = max(0.0, tower.cooldown - dt)
             position = entities.positions.get(tower_id)
             if not position:
                 continue
-            target_id = self.tower_ai.select_target(tower_id, tower, position, entities)
-            if target_id is None:
+            target = entities.targets.get(tower_id)
+            if target is None:
+                # 本帧直接使用该对象，组件在同步点挂载
+                target = comp.Target()
+                entities.commands.add(tower_id, target)
+            had_target = target.enemy_id is not None
+            sticky = had_target and self._current_target(tower, position, target, entities)
+            # 本帧刚失去目标时立即补选一次；空闲的塔与其他塔一样按轮转周期选靶，
+            # 射程内长期无敌人的塔不会每帧扫描全部敌人
+            if (had_target and not sticky) or (self._frame + entity_slot(tower_id)) % interval == 0:
+                # select_target 只返回射程内的敌人，无需再次计算距离
+                target.enemy_id = self.tower_ai.select_target(tower_id, tower, position, entities)
+            target_id = target.enemy_id
+            if target_id is None or tower.cooldown > 0:
                 continue
-            target_position = entities.positions.get(target_id)
             target_combat = entities.combats.get(target_id)
-            if not target_position or not target_combat:
-                continue
-            distance = math.dist((position.x, position.y), (target_position.x, target_position.y))
-            if distance > tower.range * self.grid_size:
-                continue
-            if tower.cooldown > 0:
+            if not target_combat:
                 continue
             tower.cooldown = 1.0 / max(0.1, tower.attack_speed)
             damage, slow = self.damage_calc.calculate(tower, target_combat)
             target_combat.health -= damage
             if slow is not None:
-                effects = entities.effects.setdefault(target_id, comp.Effects())
-                effects.slows.append(slow)
+                entities.commands.add(target_id, slow)
             if target_combat.health <= 0:
                 enemy = entities.enemies.get(target_id)
                 if enemy:
                     on_enemy_killed(target_id, enemy)
-                entities.remove(target_id)
-            entities.targets.setdefault(tower_id, comp.Target()).enemy_id = target_id
+                # 延迟到同步点移除，本帧后续的塔不会再选中它
+                entities.commands.destroy(target_id)
+                target.enemy_id = None
             tower.experience += damage
-            self.tower_ai.learn(tower_id, target_combat.element, damage)
+            self.tower_ai.learn(tower_id, target_combat.element, damage, tower.tower_type)
 
 
 class CleanupSystem:
     """敌人死亡或到达终点后的善后系统。"""
 
-    def __init__(self, goal: Tuple[int, int], grid_size: int, on_enemy_escape: Callable[[comp.Enemy], None]) -> None:
-        self.goal = goal
+    def __init__(
+        self,
+        goals: Sequence[Tuple[int, int]],
+        grid_size: int,
+        on_enemy_escape: Callable[[comp.Enemy], None],
+    ) -> None:
+        self.goals = list(goals)
         self.grid_size = grid_size
         self.on_enemy_escape = on_enemy_escape
 
     def update(self, entities: EntityManager) -> None:
-        goal_px = (self.goal[0] * self.grid_size + self.grid_size / 2, self.goal[1] * self.grid_size + self.grid_size / 2)
-        for enemy_id, enemy in list(entities.enemies.items()):
+        half = self.grid_size / 2
+        goals_px = [(goal[0] * self.grid_size + half, goal[1] * self.grid_size + half) for goal in self.goals]
+        pending = entities.commands.pending_destroy
+        for enemy_id, enemy in entities.enemies.items():
+            if enemy_id in pending:
+                continue
             position = entities.positions.get(enemy_id)
             if not position:
                 continue
-            if abs(position.x - goal_px[0]) < self.grid_size / 2 and abs(position.y - goal_px[1]) < self.grid_size / 2:
+            if any(abs(position.x - gx) < half and abs(position.y - gy) < half for gx, gy in goals_px):
                 self.on_enemy_escape(enemy)
-                entities.remove(enemy_id)
+                entities.commands.destroy(enemy_id)
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-import pygame
+import time
 
-from game.core.config_loader import DataManager
-from game.core.game import Game
+# 在导入 pygame 之前取时间，首帧耗时包含模块导入
+STARTED_AT = time.perf_counter()
+
+import pygame  # noqa: E402
+
+from game.core.config_loader import DataManager  # noqa: E402
+from game.core.game import Game  # noqa: E402
 
 
 def main() -> None:
-    pygame.init()
+    # 只初始化用到的显示与字体模块，跳过音频等耗时的子系统
+    pygame.display.init()
+    pygame.font.init()
     data = DataManager()
     level = data.load_level("level1")
     tile_size = 64
@@ -16,11 +23,12 @@ def main() -> None:
     screen = pygame.display.set_mode((width, height))
     pygame.display.set_caption("AI 塔防原型")
 
-    game = Game(screen)
-    game.setup("level1")
+    game = Game(screen, data=data)
+    game.setup("level1", level_data=level)
 
     clock = pygame.time.Clock()
     running = True
+    first_frame = True
     while running:
         dt = clock.tick(60) / 1000.0
         current_time = pygame.time.get_ticks() / 1000.0
@@ -33,6 +41,10 @@ def main() -> None:
         screen.fill((10, 10, 10))
         game.render()
         pygame.display.flip()
+        if first_frame:
+            first_frame = False
+            game.first_frame_ms = (time.perf_counter() - STARTED_AT) * 1000.0
+    game.shutdown()
     pygame.quit()
 
 